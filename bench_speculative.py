@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+Benchmark speculative (assisted) decoding untuk engine transformers.
+
+Model draft kecil mengusulkan token, model utama memverifikasi. Hasil greedy
+harus identik dengan decode biasa; script ini mengecek itu dan melaporkan
+tokens/sec serta real-time factor dengan dan tanpa model draft.
+
+Contoh (CPU, model kecil):
+    python bench_speculative.py --audio clip.wav --model openai/whisper-small \
+        --draft-model openai/whisper-tiny --device cpu
+"""
+import sys
+import time
+import argparse
+
+import soundfile as sf
+import torch
+import torchaudio
+from transformers import AutoFeatureExtractor, AutoModelForCausalLM, AutoModelForSpeechSeq2Seq
+
+SAMPLE_RATE = 16000
+CHUNK_SECONDS = 30   # panjang input native Whisper
+
+DTYPES = {
+    "float32": torch.float32,
+    "float16": torch.float16,
+    "bfloat16": torch.bfloat16,
+}
+
+def load_audio(path, max_seconds=None):
+    """Load audio as float32 mono at 16kHz."""
+    audio, sr = sf.read(path, dtype="float32")
+    if audio.ndim > 1:
+        audio = audio.mean(axis=1)
+    if sr != SAMPLE_RATE:
+        audio = torchaudio.functional.resample(torch.from_numpy(audio), sr, SAMPLE_RATE).numpy()
+    if max_seconds:
+        audio = audio[:int(max_seconds * SAMPLE_RATE)]
+    return audio
+
+def split_chunks(audio):
+    """Split audio into consecutive 30s windows."""
+    size = CHUNK_SECONDS * SAMPLE_RATE
+    return [audio[i:i + size] for i in range(0, len(audio), size)]
+
+def load_draft_model(draft_id, device, dtype, decoder_only=False):
+    """Load the draft model.
+
+    A full seq2seq draft runs its own encoder, so it must use the same
+    number of mel bins as the main model. A decoder-only draft
+    (WhisperForCausalLM) reuses the main model's encoder outputs.
+    """
+    if decoder_only:
+        model = AutoModelForCausalLM.from_pretrained(draft_id, dtype=dtype)
+    else:
+        model = AutoModelForSpeechSeq2Seq.from_pretrained(draft_id, dtype=dtype)
+    return model.to(device).eval()
+
+def decode_chunks(model, feature_extractor, chunks, device, dtype, language, assistant_model=None,
+                  max_new_tokens=440):
+    """Greedy-decode every chunk; returns (token id lists, elapsed seconds)."""
+    outputs = []
+    elapsed = 0.0
+    for chunk in chunks:
+        features = feature_extractor(chunk, sampling_rate=SAMPLE_RATE, return_tensors="pt").input_features
+        features = features.to(device, dtype)
+
+        kwargs = {}
+        if assistant_model is not None:
+            kwargs["assistant_model"] = assistant_model
+
+        if device == "cuda":
+            torch.cuda.synchronize()
+        t0 = time.perf_counter()
+        with torch.inference_mode():
+            ids = model.generate(
+                features,
+                language=language,
+                task="transcribe",
+                num_beams=1,
+                do_sample=False,
+                max_new_tokens=max_new_tokens,
+                **kwargs,
+            )
+        if device == "cuda":
+            torch.cuda.synchronize()
+        elapsed += time.perf_counter() - t0
+        outputs.append(ids[0].tolist())
+    return outputs, elapsed
+
+def report_row(label, outputs, elapsed, audio_seconds):
+    tokens = sum(len(ids) for ids in outputs)
+    print(f"  {label:<8} {tokens:>7} {elapsed:>9.2f}s {tokens / elapsed:>10.1f} {elapsed / audio_seconds:>8.3f}")
+    return tokens
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark speculative decoding (model draft) untuk Whisper transformers")
+    parser.add_argument("--audio", required=True, help="File audio untuk benchmark")
+    parser.add_argument("--model", default="kotoba-tech/kotoba-whisper-v2.0",
+                        help="Model utama (default: kotoba-tech/kotoba-whisper-v2.0)")
+    parser.add_argument("--draft-model", required=True,
+                        help="Model draft kecil (tokenizer dan jumlah mel bins harus sama dengan model utama)")
+    parser.add_argument("--draft-decoder-only", action="store_true",
+                        help="Model draft adalah WhisperForCausalLM (decoder saja, memakai encoder model utama)")
+    parser.add_argument("--device", default="cpu", choices=["cpu", "cuda"], help="Device (default: cpu)")
+    parser.add_argument("--dtype", default="float32", choices=list(DTYPES), help="Tipe data (default: float32)")
+    parser.add_argument("--language", default="ja", help="Bahasa audio (default: ja)")
+    parser.add_argument("--max-seconds", type=float, default=None, help="Hanya pakai N detik pertama audio")
+    parser.add_argument("--max-new-tokens", type=int, default=440, help="Batas token per window 30s (default: 440)")
+    args = parser.parse_args()
+
+    dtype = DTYPES[args.dtype]
+    audio = load_audio(args.audio, args.max_seconds)
+    audio_seconds = len(audio) / SAMPLE_RATE
+    chunks = split_chunks(audio)
+    if not chunks:
+        print("Error: audio kosong.")
+        sys.exit(1)
+
+    print(f"Audio: {args.audio} ({audio_seconds:.1f}s, {len(chunks)} window {CHUNK_SECONDS}s)")
+    print(f"Model: {args.model}")
+    print(f"Draft: {args.draft_model}{' (decoder-only)' if args.draft_decoder_only else ''}")
+    print(f"Device: {args.device} ({args.dtype})")
+
+    feature_extractor = AutoFeatureExtractor.from_pretrained(args.model)
+    model = AutoModelForSpeechSeq2Seq.from_pretrained(args.model, dtype=dtype).to(args.device).eval()
+    draft = load_draft_model(args.draft_model, args.device, dtype, args.draft_decoder_only)
+
+    # Warm-up agar alokasi/kernel pertama tidak ikut terukur
+    warmup = chunks[:1]
+    decode_chunks(model, feature_extractor, warmup, args.device, dtype, args.language, None, 8)
+    decode_chunks(model, feature_extractor, warmup, args.device, dtype, args.language, draft, 8)
+
+    print("\nDecoding tanpa draft...")
+    base_ids, base_time = decode_chunks(model, feature_extractor, chunks, args.device, dtype,
+                                        args.language, None, args.max_new_tokens)
+    print("Decoding dengan draft...")
+    spec_ids, spec_time = decode_chunks(model, feature_extractor, chunks, args.device, dtype,
+                                        args.language, draft, args.max_new_tokens)
+
+    print(f"\n  {'Mode':<8} {'Tokens':>7} {'Waktu':>10} {'Tokens/s':>10} {'RTF':>8}")
+    report_row("greedy", base_ids, base_time, audio_seconds)
+    report_row("draft", spec_ids, spec_time, audio_seconds)
+    print(f"\nSpeedup: {base_time / spec_time:.2f}x")
+
+    mismatches = [i for i, (a, b) in enumerate(zip(base_ids, spec_ids)) if a != b]
+    if mismatches:
+        print(f"❌ Output TIDAK identik di window: {', '.join(str(i) for i in mismatches)}")
+        sys.exit(1)
+    print("✅ Output identik dengan greedy decoding")
+
+if __name__ == "__main__":
+    main()
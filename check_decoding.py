@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Cek loop guard dan adaptive decoding dengan model Whisper palsu (tanpa model/GPU).
+
+Model palsu menjawab dari skrip segmen bertimestamp absolut. Sampel audio
+berisi waktunya sendiri (detik), jadi model tahu potongan mana yang
+diberikan dan mencatat panjang setiap input: decode ulang dan resume harus
+menerima potongan audio saja, bukan seluruh file. Exit code 1 jika ada
+skenario yang gagal.
+
+Contoh:
+    python check_decoding.py
+"""
+import sys
+from types import SimpleNamespace
+
+import numpy as np
+
+import whisper
+from whisper import LOOP_REDECODE_SECONDS, SAMPLE_RATE
+
+DURATION = 240.0
+LOOP_START = 60.0
+LOOP_END = 70.0
+
+class FakeWhisperModel:
+    """Stand-in for faster_whisper.WhisperModel driven by scripted segments.
+
+    `scripts` maps a decode mode ('greedy', 'beam', 'redecode') to a list
+    of segment dicts with absolute times; the mode is picked from the
+    transcribe options. Segments overlapping a clip are yielded relative
+    to the start of the audio they were given.
+    """
+
+    def __init__(self, scripts):
+        self.scripts = scripts
+        self.calls = []
+
+    def transcribe(self, audio, clip_timestamps=None, beam_size=5, **options):
+        base = round(float(audio[0]) * SAMPLE_RATE) / SAMPLE_RATE
+        length = len(audio) / SAMPLE_RATE
+        mode = 'redecode' if 'repetition_penalty' in options else ('greedy' if beam_size == 1 else 'beam')
+        self.calls.append((mode, base, length))
+        clips = clip_timestamps or [0.0, length]
+        intervals = [(base + clips[i], base + clips[i + 1]) for i in range(0, len(clips), 2)]
+        info = SimpleNamespace(language="ja", language_probability=1.0)
+        return self.iterate(self.scripts[mode], intervals, base), info
+
+    def iterate(self, script, intervals, base):
+        for seg in script:
+            if any(seg['start'] < end and seg['end'] > start for start, end in intervals):
+                yield SimpleNamespace(start=seg['start'] - base, end=seg['end'] - base, text=seg['text'],
+                                      avg_logprob=seg.get('avg_logprob', -0.1), no_speech_prob=0.0,
+                                      compression_ratio=1.0)
+
+def timed_audio(duration=DURATION):
+    """Audio whose every sample holds its own time in seconds."""
+    return (np.arange(int(duration * SAMPLE_RATE)) / SAMPLE_RATE).astype(np.float32)
+
+def line(t):
+    """Distinct dialog text for the segment starting at t (no shared n-grams between neighbours)."""
+    return "".join(chr(0x4E00 + (int(t) * 13 + j * 101) % 5000) for j in range(6))
+
+def script(start, end, step, text, **fields):
+    return [{'start': t, 'end': t + step, 'text': text(t), **fields} for t in np.arange(start, end, step)]
+
+def overlaps(segments):
+    """Pairs of consecutive segments that overlap in time."""
+    ordered = sorted(segments, key=lambda seg: seg['start'])
+    return [(a, b) for a, b in zip(ordered, ordered[1:]) if b['start'] < a['end'] - 1e-6]
+
+def check_loop_guard():
+    """A loop at LOOP_START..LOOP_END is re-decoded and decoding resumes on audio slices only."""
+    beam = (script(0, LOOP_START, 2, line)
+            + script(LOOP_START, LOOP_END, 2, lambda t: "ああああ")
+            + script(LOOP_END, DURATION, 2, line))
+    model = FakeWhisperModel({'beam': beam, 'redecode': script(0, DURATION, 2, line)})
+    audio = timed_audio()
+    whisper.decode_audio = lambda path, sampling_rate: audio
+    segments = whisper.transcribe_with_loop_guard(model, "fake.wav")
+
+    problems = []
+    texts = [seg['text'] for seg in segments]
+    if "ああああ" in texts:
+        problems.append("teks loop masih ada")
+    if texts != [line(t) for t in np.arange(0, DURATION, 2)]:
+        problems.append("segmen hilang atau ganda")
+    if overlaps(segments):
+        problems.append(f"segmen tumpang tindih: {overlaps(segments)[:2]}")
+    for mode, base, length in model.calls[1:]:
+        if length >= DURATION:
+            problems.append(f"decode {mode} menerima seluruh audio ({length:.0f}s)")
+    redecode = [call for call in model.calls if call[0] == 'redecode']
+    if len(redecode) != 1 or redecode[0][2] > LOOP_REDECODE_SECONDS + 1:
+        problems.append(f"decode ulang tidak sebatas window: {redecode}")
+    return problems
+
+def check_adaptive_splice():
+    """Beam segments spilling into the padding are clamped, never duplicated or dropped."""
+    flagged = {'avg_logprob': -1.0}
+    greedy = (script(0, 10, 2, line) + script(10, 14, 2, line, **flagged) + script(14, 22, 2, line)
+              + script(25, 27, 2, line, **flagged) + script(27, 40, 2, line))
+    # B1 meluber ke segmen greedy 8-10, B3 titik tengahnya di padding, B4/B5 di celah hening dan melewati 27
+    beam_texts = {"B1": (9.5, 11.5), "B2": (11.5, 13.2), "B3": (13.2, 14.9), "B4": (24.6, 26.0), "B5": (26.0, 27.3)}
+    beam = [{'start': 0.0, 'end': 9.5, 'text': "B0"}] + [
+        {'start': start, 'end': end, 'text': text} for text, (start, end) in beam_texts.items()
+    ] + [{'start': 27.3, 'end': 40.0, 'text': "B6"}]
+    model = FakeWhisperModel({'greedy': greedy, 'beam': beam})
+    segments, _ = whisper.transcribe_adaptive(model, timed_audio(40.0))
+
+    problems = []
+    texts = [seg['text'] for seg in segments]
+    expected = ([line(t) for t in np.arange(0, 10, 2)] + ["B1", "B2", "B3"] + [line(t) for t in np.arange(14, 22, 2)]
+                + ["B4", "B5"] + [line(t) for t in np.arange(27, 40, 2)])
+    if texts != expected:
+        problems.append(f"hasil sambungan salah: {texts}")
+    if overlaps(segments):
+        problems.append(f"segmen tumpang tindih: {overlaps(segments)[:2]}")
+    for mode, base, length in model.calls[1:]:
+        if length >= 40.0:
+            problems.append(f"decode {mode} menerima seluruh audio ({length:.0f}s)")
+    return problems
+
+CHECKS = [
+    ("loop guard: decode ulang + resume per potongan", check_loop_guard),
+    ("adaptive: sambungan tanpa teks ganda/hilang", check_adaptive_splice),
+]
+
+def main():
+    failures = 0
+    for name, check in CHECKS:
+        print(f"\n[{name}]")
+        problems = check()
+        if problems:
+            failures += 1
+            for problem in problems:
+                print(f"✗ {problem}")
+        else:
+            print(f"✓ {name}")
+
+    print(f"\n{len(CHECKS) - failures}/{len(CHECKS)} skenario lolos")
+    return 1 if failures else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
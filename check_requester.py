@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+Cek deadline, retry, hedging dan Batch API ChatRequester terhadap mock_openai.py.
+
+Mock server dijalankan di thread sendiri (port acak), lalu setiap skenario
+menyuntikkan fault secara berurutan dan mencocokkan counter ChatRequester:
+timeout, retry 5xx/429, retry habis, error non-retryable dan hedge
+dikirim/menang. Skenario batch menjalankan translate_segments_batch_mode
+dari submit, polling, satu baris gagal sampai resume dengan --batch-id.
+Exit code 1 jika ada skenario yang gagal.
+
+Contoh:
+    python check_requester.py
+"""
+import sys
+
+import openai
+from openai import OpenAI
+
+from mock_openai import MockOpenAIServer
+from whisper import HEDGE_MIN_SAMPLES, ChatRequester, translate_segments_batch_mode
+
+MESSAGES = [
+    {"role": "system", "content": "mock"},
+    {"role": "user", "content": "[Dialog 1] こんにちは"},
+]
+
+def make_requester(server, **kwargs):
+    return ChatRequester(OpenAI(api_key="mock", base_url=server.url), **kwargs)
+
+def run_requests(requester, n=1):
+    """Send n requests; returns the number that raised."""
+    failed = 0
+    for _ in range(n):
+        try:
+            requester.create_chat(model="mock", messages=MESSAGES)
+        except openai.OpenAIError:
+            failed += 1
+    return failed
+
+def counter_problems(requester, unexpected, expected):
+    """Print and close the requester; list the counters that differ from `expected`."""
+    requester.print_stats()
+    requester.close()
+    problems = [f"{key}: diharapkan {value}, didapat {requester.stats[key]}"
+                for key, value in expected.items() if requester.stats[key] != value]
+    if unexpected:
+        problems.append(f"{unexpected} request gagal tak terduga")
+    return problems
+
+def check_timeout(server):
+    server.faults.extend(["slow"])
+    requester = make_requester(server, timeout=0.5, retries=2)
+    failed = run_requests(requester)
+    return counter_problems(requester, failed, {'timeouts': 1, 'retries': 1, 'errors': 0})
+
+def check_status_retry(server):
+    server.faults.extend(["500", "429"])
+    requester = make_requester(server, timeout=5, retries=2)
+    failed = run_requests(requester)
+    return counter_problems(requester, failed, {'attempts': 3, 'retries': 2, 'errors': 0})
+
+def check_retries_exhausted(server):
+    server.faults.extend(["500", "500", "500"])
+    requester = make_requester(server, timeout=5, retries=2)
+    failed = run_requests(requester)
+    return counter_problems(requester, failed - 1, {'attempts': 3, 'retries': 2, 'errors': 1})
+
+def check_not_retryable(server):
+    server.faults.extend(["400"])
+    requester = make_requester(server, timeout=5, retries=2)
+    failed = run_requests(requester)
+    return counter_problems(requester, failed - 1, {'attempts': 1, 'retries': 0, 'errors': 1})
+
+def check_hedge(server):
+    # Cukup sampel latency normal dulu, lalu satu request lambat yang disalip hedge
+    requester = make_requester(server, timeout=5, retries=0, hedge=True, hedge_budget=1.0)
+    failed = run_requests(requester, HEDGE_MIN_SAMPLES)
+    server.faults.extend(["slow"])
+    failed += run_requests(requester)
+    return counter_problems(requester, failed, {'hedges_fired': 1, 'hedges_won': 1, 'errors': 0})
+
+def batch_jobs():
+    """Two SRT-like jobs: 7 + 3 subtitles, i.e. requests 0:0, 0:5 and 1:0 with batch_size 5."""
+    return [
+        [{'start': i, 'end': i + 1, 'text': f"台詞{job}-{i}"} for i in range(n)]
+        for job, n in enumerate((7, 3))
+    ]
+
+def check_batch_mode(server):
+    # Baris 0:5 gagal di output batch: subtitle 6-7 file pertama harus kembali ke text original
+    server.fail_custom_ids = {"0:5"}
+    requester = make_requester(server, timeout=5, retries=0)
+    jobs = batch_jobs()
+    expected = [
+        [f"mock: {seg['text']}" if i < 5 else seg['text'] for i, seg in enumerate(jobs[0])],
+        [f"mock: {seg['text']}" for seg in jobs[1]],
+    ]
+
+    problems = []
+    translated = translate_segments_batch_mode(requester, jobs, "mock", 5, "Subtitle", poll_interval=0)
+    if [[seg['text'] for seg in job] for job in translated] != expected:
+        problems.append(f"hasil batch salah: {[[seg['text'] for seg in job] for job in translated]}")
+    if len(server.batches) != 1 or len(server.files) != 2:
+        problems.append(f"diharapkan 1 batch job + 2 file, didapat {len(server.batches)} + {len(server.files)}")
+    batch_id = next(iter(server.batches), None)
+    if batch_id and server.batches[batch_id]['polls'] < server.batch_polls:
+        problems.append("job batch tidak di-poll sampai selesai")
+
+    # Resume: --batch-id memakai job yang sama, tanpa upload/submit baru
+    resumed = translate_segments_batch_mode(requester, jobs, "mock", 5, "Subtitle", poll_interval=0,
+                                            batch_ids=[batch_id])
+    if [[seg['text'] for seg in job] for job in resumed] != expected:
+        problems.append("hasil resume --batch-id berbeda")
+    if len(server.batches) != 1 or len(server.files) != 2:
+        problems.append("resume --batch-id mengirim batch job baru")
+    requester.close()
+    return problems
+
+CHECKS = [
+    ("timeout + retry", check_timeout),
+    ("retry 500/429", check_status_retry),
+    ("retry habis", check_retries_exhausted),
+    ("error non-retryable (400)", check_not_retryable),
+    ("hedge dikirim + menang", check_hedge),
+    ("batch: submit, poll, baris gagal, resume --batch-id", check_batch_mode),
+]
+
+def main():
+    failures = 0
+    for name, check in CHECKS:
+        # Server baru per skenario agar fault, file dan batch job tidak terbawa
+        server = MockOpenAIServer(delay=0.05, slow_seconds=2.0).start()
+        print(f"\n[{name}] mock di {server.url}")
+        try:
+            problems = check(server)
+        finally:
+            server.stop()
+        if problems:
+            failures += 1
+            for problem in problems:
+                print(f"✗ {problem}")
+        else:
+            print(f"✓ {name}")
+
+    print(f"\n{len(CHECKS) - failures}/{len(CHECKS)} skenario lolos")
+    return 1 if failures else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
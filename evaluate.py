@@ -0,0 +1,414 @@
+#!/usr/bin/env python3
+"""
+Evaluasi akurasi vs kecepatan untuk engine dan compute type Whisper.
+
+Setiap klip di --clips adalah file audio dengan SRT referensi bernama sama
+(mis. ep01.wav + ep01.srt). Setiap konfigurasi (engine x compute type)
+dijalankan di proses terpisah agar load time dan peak memory terukur
+bersih, lalu dilaporkan CER (character error rate), real-time factor,
+peak RAM host (RSS), peak VRAM (device cuda) dan load time, beserta
+Pareto front CER vs RTF.
+
+Berjalan offline: model harus berupa path lokal (HF_HUB_OFFLINE=1).
+
+Contoh:
+    python evaluate.py --clips fixtures/ --faster-whisper-model models/kotoba-ct2 \
+        --compute-types int8,float32 --device cpu --cer-target 0.15
+"""
+import os
+import sys
+import json
+import time
+import queue
+import argparse
+import threading
+import resource
+import unicodedata
+import multiprocessing as mp
+from pathlib import Path
+
+AUDIO_EXTENSIONS = ('.wav', '.mp3', '.mp4', '.m4a', '.ogg', '.flac', '.webm')
+
+# Compute type -> torch dtype untuk engine transformers
+TRANSFORMERS_DTYPES = ("float32", "float16", "bfloat16")
+
+# Interval cek apakah child process masih hidup saat menunggu hasil
+RESULT_POLL_SECONDS = 1.0
+
+# Mode decode faster-whisper: beam search penuh, atau greedy + beam hanya di segmen yang ragu
+DECODE_MODES = ("beam", "adaptive")
+
+# Interval sampling NVML untuk peak VRAM CTranslate2 (di luar allocator torch)
+NVML_SAMPLE_SECONDS = 0.05
+
+def normalize_for_cer(text):
+    """NFKC-normalize and drop whitespace/punctuation/symbols before scoring."""
+    text = unicodedata.normalize("NFKC", text)
+    return "".join(
+        ch for ch in text
+        if not ch.isspace() and unicodedata.category(ch)[0] not in ("P", "S")
+    )
+
+def edit_distance(ref, hyp):
+    """Levenshtein distance between two strings (character level)."""
+    if len(ref) < len(hyp):
+        ref, hyp = hyp, ref
+    previous = list(range(len(hyp) + 1))
+    for i, r in enumerate(ref, 1):
+        current = [i]
+        for j, h in enumerate(hyp, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (r != h)))
+        previous = current
+    return previous[-1]
+
+def find_clips(clips_dir):
+    """Pair every audio file with its reference SRT (same stem)."""
+    clips = []
+    for path in sorted(Path(clips_dir).iterdir()):
+        if path.suffix.lower() not in AUDIO_EXTENSIONS:
+            continue
+        reference = path.with_suffix(".srt")
+        if not reference.exists():
+            print(f"Warning: {path.name} tidak punya SRT referensi, skip...")
+            continue
+        clips.append((str(path), str(reference)))
+    return clips
+
+def build_configs(args):
+    """All (engine, model, compute type) combinations requested on the command line."""
+    configs = []
+    if args.faster_whisper_model:
+        for compute_type in args.compute_types.split(","):
+            for decode in args.decode_modes.split(","):
+                if not decode.strip():
+                    continue
+                configs.append({
+                    'engine': "faster-whisper",
+                    'model': args.faster_whisper_model,
+                    'compute_type': compute_type.strip(),
+                    'decode': decode.strip(),
+                    'device': args.device,
+                })
+    if args.transformers_model:
+        for dtype in args.transformers_dtypes.split(","):
+            configs.append({
+                'engine': "transformers",
+                'model': args.transformers_model,
+                'compute_type': dtype.strip(),
+                'device': args.device,
+            })
+    return configs
+
+def load_engine(config, decode_stats=None):
+    """Load a model; returns a function audio(np.ndarray @16kHz) -> transcript text.
+
+    For adaptive decoding the per-clip stats of transcribe_adaptive are
+    appended to `decode_stats`.
+    """
+    if config['engine'] == "faster-whisper":
+        from faster_whisper import WhisperModel
+        from whisper import TRANSCRIBE_OPTIONS, transcribe_adaptive
+
+        model = WhisperModel(config['model'], device=config['device'],
+                             compute_type=config['compute_type'], local_files_only=True)
+
+        if config.get('decode') == "adaptive":
+            def transcribe(audio):
+                segments, stats = transcribe_adaptive(model, audio)
+                if decode_stats is not None:
+                    decode_stats.append(stats)
+                return "".join(seg['text'] for seg in segments)
+            return transcribe
+
+        def transcribe(audio):
+            segments_iter, _ = model.transcribe(audio, **TRANSCRIBE_OPTIONS)
+            return "".join(seg.text for seg in segments_iter)
+        return transcribe
+
+    if config['engine'] == "transformers":
+        import torch
+        from transformers import pipeline
+
+        pipe = pipeline(
+            "automatic-speech-recognition",
+            model=config['model'],
+            dtype=getattr(torch, config['compute_type']),
+            device=config['device'],
+        )
+
+        def transcribe(audio):
+            result = pipe(
+                {"array": audio, "sampling_rate": 16000},
+                chunk_length_s=30,
+                batch_size=8,
+                generate_kwargs={"language": "japanese", "task": "transcribe"},
+            )
+            return result["text"]
+        return transcribe
+
+    raise ValueError(f"Engine tidak dikenal: {config['engine']}")
+
+class NvmlPeakSampler:
+    """Background thread sampling GPU memory in use through NVML.
+
+    CTranslate2 allocates VRAM outside torch, so its peak is only visible
+    to the driver. The peak is taken over device memory in use above the
+    baseline at start(); configurations run one at a time, so the delta
+    belongs to this process. `peak_mb` stays None without pynvml.
+    """
+
+    def __init__(self, device_index=0, interval=NVML_SAMPLE_SECONDS):
+        self.device_index = device_index
+        self.interval = interval
+        self.peak_mb = None
+        self.stopped = threading.Event()
+        self.thread = None
+
+    def start(self):
+        try:
+            import pynvml
+        except ImportError:
+            print("Warning: pynvml tidak terpasang (pip install nvidia-ml-py), peak VRAM tidak diukur")
+            return self
+        pynvml.nvmlInit()
+        handle = pynvml.nvmlDeviceGetHandleByIndex(self.device_index)
+        baseline = pynvml.nvmlDeviceGetMemoryInfo(handle).used
+        self.peak_mb = 0.0
+
+        def sample():
+            while True:
+                used = pynvml.nvmlDeviceGetMemoryInfo(handle).used - baseline
+                self.peak_mb = max(self.peak_mb, used / 2**20)
+                if self.stopped.wait(self.interval):
+                    break
+            pynvml.nvmlShutdown()
+
+        self.thread = threading.Thread(target=sample, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.stopped.set()
+        if self.thread:
+            self.thread.join()
+        return self.peak_mb
+
+def start_vram_measurement(config):
+    """Start measuring peak VRAM for a cuda configuration; returns a function -> (MB or None, source)."""
+    if config['device'] != "cuda":
+        return lambda: (None, None)
+    if config['engine'] == "transformers":
+        import torch
+        torch.cuda.reset_peak_memory_stats()
+        return lambda: (torch.cuda.max_memory_allocated() / 2**20, "torch")
+    sampler = NvmlPeakSampler().start()
+    return lambda: (sampler.stop(), "nvml")
+
+def run_config(config, clips, results):
+    """Child process: load one configuration, transcribe all clips, report metrics."""
+    try:
+        from faster_whisper import decode_audio
+        from whisper import SAMPLE_RATE, read_srt_file
+
+        decode_stats = []
+        stop_vram = start_vram_measurement(config)
+        t0 = time.perf_counter()
+        transcribe = load_engine(config, decode_stats)
+        load_time = time.perf_counter() - t0
+
+        edits = 0
+        ref_chars = 0
+        audio_seconds = 0.0
+        decode_seconds = 0.0
+        per_clip = []
+        for audio_path, reference_path in clips:
+            audio = decode_audio(audio_path, sampling_rate=SAMPLE_RATE)
+            reference = normalize_for_cer("".join(seg['text'] for seg in read_srt_file(reference_path)))
+
+            t0 = time.perf_counter()
+            hypothesis = normalize_for_cer(transcribe(audio))
+            elapsed = time.perf_counter() - t0
+
+            clip_edits = edit_distance(reference, hypothesis)
+            edits += clip_edits
+            ref_chars += len(reference)
+            audio_seconds += len(audio) / SAMPLE_RATE
+            decode_seconds += elapsed
+            per_clip.append({
+                'clip': os.path.basename(audio_path),
+                'cer': clip_edits / max(len(reference), 1),
+                'rtf': elapsed / (len(audio) / SAMPLE_RATE),
+            })
+
+        peak_vram_mb, vram_source = stop_vram()
+        result = {
+            **config,
+            'cer': edits / max(ref_chars, 1),
+            'rtf': decode_seconds / audio_seconds if audio_seconds else 0.0,
+            'load_seconds': load_time,
+            # ru_maxrss dalam KB di Linux; hanya memori host, bukan VRAM
+            'peak_rss_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+            'peak_vram_mb': peak_vram_mb,
+            'peak_vram_source': vram_source,
+            'clips': per_clip,
+        }
+        if decode_stats:
+            decoded = sum(s['decoded_seconds'] for s in decode_stats)
+            result['redecoded_share'] = sum(s['redecoded_seconds'] for s in decode_stats) / decoded if decoded else 0.0
+        results.put(result)
+    except Exception as e:
+        results.put({**config, 'error': f"{type(e).__name__}: {e}"})
+
+def evaluate_config(config, clips):
+    """Run one configuration in a fresh process so memory and load time are isolated."""
+    ctx = mp.get_context("spawn")
+    results = ctx.Queue()
+    process = ctx.Process(target=run_config, args=(config, clips, results))
+    process.start()
+    # Poll so a child killed without reporting (e.g. OOM, exit 137) does not hang the harness
+    while True:
+        try:
+            result = results.get(timeout=RESULT_POLL_SECONDS)
+            break
+        except queue.Empty:
+            if process.is_alive():
+                continue
+            # The child may have reported right before exiting
+            try:
+                result = results.get(timeout=RESULT_POLL_SECONDS)
+            except queue.Empty:
+                result = {**config, 'error': f"exit code {process.exitcode}"}
+            break
+    process.join()
+    return result
+
+def pareto_front(results):
+    """Configurations not beaten on both CER and RTF by another configuration."""
+    front = []
+    for r in results:
+        dominated = any(
+            o['cer'] <= r['cer'] and o['rtf'] <= r['rtf'] and (o['cer'] < r['cer'] or o['rtf'] < r['rtf'])
+            for o in results
+        )
+        if not dominated:
+            front.append(r)
+    return sorted(front, key=lambda r: r['rtf'])
+
+def config_label(r):
+    label = f"{r['engine']}:{os.path.basename(os.path.normpath(r['model']))}:{r['compute_type']}"
+    if r.get('decode', "beam") != "beam":
+        label += f":{r['decode']}"
+    return label
+
+def print_adaptive_report(ok):
+    """Adaptive decoding vs the always-beam run of the same model and compute type."""
+    baselines = {
+        (r['model'], r['compute_type']): r
+        for r in ok if r['engine'] == "faster-whisper" and r.get('decode') == "beam"
+    }
+    rows = [(r, baselines.get((r['model'], r['compute_type'])))
+            for r in ok if r.get('decode') == "adaptive"]
+    if not rows:
+        return
+    print(f"\nAdaptive vs beam search:")
+    for r, base in rows:
+        line = f"  {config_label(r)}  decode ulang {r.get('redecoded_share', 0.0):.1%} audio"
+        if base and r['rtf']:
+            line += f", speedup {base['rtf'] / r['rtf']:.2f}x, CER {base['cer']:.3f} -> {r['cer']:.3f}"
+        print(line)
+
+def format_mb(value):
+    return "-" if value is None else f"{value:.0f}"
+
+def print_report(results, cer_target=None):
+    ok = [r for r in results if 'error' not in r]
+    failed = [r for r in results if 'error' in r]
+
+    print(f"\n{'='*78}")
+    print(f"{'Konfigurasi':<40} {'CER':>7} {'RTF':>7} {'Load':>7} {'RAM MB':>8} {'VRAM MB':>8}")
+    for r in sorted(ok, key=lambda r: r['cer']):
+        print(f"{config_label(r):<40} {r['cer']:>7.3f} {r['rtf']:>7.3f} {r['load_seconds']:>6.1f}s "
+              f"{format_mb(r['peak_rss_mb']):>8} {format_mb(r['peak_vram_mb']):>8}")
+    for r in failed:
+        print(f"{config_label(r):<40} GAGAL: {r['error']}")
+    print("RAM MB = peak RSS host (ru_maxrss). VRAM MB = peak GPU: allocator torch (transformers) atau "
+          "NVML di atas baseline (faster-whisper, termasuk CUDA context); '-' = tidak diukur.")
+
+    if not ok:
+        return
+
+    print_adaptive_report(ok)
+
+    front = pareto_front(ok)
+    print(f"\nPareto front (CER vs RTF, dari tercepat):")
+    for r in front:
+        print(f"  {config_label(r)}  CER {r['cer']:.3f}  RTF {r['rtf']:.3f}")
+
+    if cer_target is not None:
+        meeting = [r for r in ok if r['cer'] <= cer_target]
+        if meeting:
+            best = min(meeting, key=lambda r: r['rtf'])
+            print(f"\nTercepat dengan CER <= {cer_target}: {config_label(best)} (CER {best['cer']:.3f}, RTF {best['rtf']:.3f})")
+        else:
+            print(f"\nTidak ada konfigurasi dengan CER <= {cer_target}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Evaluasi CER vs kecepatan untuk engine/compute type Whisper (offline)")
+    parser.add_argument("--clips", required=True,
+                        help="Direktori berisi klip audio + SRT referensi dengan nama yang sama")
+    parser.add_argument("--faster-whisper-model", default=None, help="Path lokal model CTranslate2 (faster-whisper)")
+    parser.add_argument("--compute-types", default="int8,float16,float32",
+                        help="Compute type faster-whisper yang dibandingkan (default: int8,float16,float32)")
+    parser.add_argument("--decode-modes", default="beam",
+                        help=f"Mode decode faster-whisper yang dibandingkan, opsi: {', '.join(DECODE_MODES)} "
+                             f"(default: beam; mis. beam,adaptive untuk speedup adaptive decoding)")
+    parser.add_argument("--transformers-model", default=None, help="Path lokal model HuggingFace Transformers")
+    parser.add_argument("--transformers-dtypes", default="float16",
+                        help=f"Dtype transformers yang dibandingkan, opsi: {', '.join(TRANSFORMERS_DTYPES)} (default: float16)")
+    parser.add_argument("--device", default="cuda", choices=["cuda", "cpu"], help="Device (default: cuda)")
+    parser.add_argument("--cer-target", type=float, default=None,
+                        help="Tampilkan konfigurasi tercepat dengan CER di bawah nilai ini (mis. 0.1)")
+    parser.add_argument("--json", default=None, help="Simpan hasil lengkap ke file JSON")
+    args = parser.parse_args()
+
+    decode_modes = [mode.strip() for mode in args.decode_modes.split(",") if mode.strip()]
+    unknown = [mode for mode in decode_modes if mode not in DECODE_MODES]
+    if unknown or not decode_modes:
+        parser.error(f"mode decode tidak dikenal: {', '.join(unknown) or '(kosong)'} (opsi: {', '.join(DECODE_MODES)})")
+
+    # Jangan pernah mengunduh model saat evaluasi
+    os.environ["HF_HUB_OFFLINE"] = "1"
+
+    clips = find_clips(args.clips)
+    if not clips:
+        print(f"Error: tidak ada klip audio + SRT referensi di {args.clips}")
+        sys.exit(1)
+
+    configs = build_configs(args)
+    if not configs:
+        parser.error("tentukan --faster-whisper-model dan/atau --transformers-model")
+
+    print(f"Klip: {len(clips)}, konfigurasi: {len(configs)}")
+    results = []
+    for config in configs:
+        print(f"Mengevaluasi {config_label(config)} ({config['device']})...")
+        result = evaluate_config(config, clips)
+        if 'error' in result:
+            print(f"  Gagal: {result['error']}")
+        else:
+            line = (f"  CER {result['cer']:.3f}, RTF {result['rtf']:.3f}, load {result['load_seconds']:.1f}s, "
+                    f"peak RAM {result['peak_rss_mb']:.0f} MB")
+            if result['peak_vram_mb'] is not None:
+                line += f", peak VRAM {result['peak_vram_mb']:.0f} MB ({result['peak_vram_source']})"
+            print(line)
+        results.append(result)
+
+    print_report(results, args.cer_target)
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2, ensure_ascii=False)
+        print(f"\nHasil disimpan ke: {args.json}")
+
+if __name__ == "__main__":
+    main()
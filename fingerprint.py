@@ -0,0 +1,423 @@
+#!/usr/bin/env python3
+"""
+Indeks fingerprint audio untuk melewati opening, ending, bumper sponsor dan
+jingle yang berulang di setiap episode.
+
+Klip referensi (mis. opening song) didaftarkan sekali bersama subtitle-nya.
+Fingerprint berupa hash pasangan puncak spektral (landmark ala Shazam) yang
+disimpan di SQLite. Sebelum ASR, audio episode dicocokkan ke indeks; region
+yang cocok tidak di-decode/diterjemahkan, tetapi diganti dengan cue yang
+tersimpan, digeser ke offset tempat klip ditemukan.
+
+Contoh:
+    python fingerprint.py add --tag opening --audio op.wav --srt ja=op_ja.srt --srt id=op_id.srt
+    python fingerprint.py match --audio ep05.wav
+    python whisper.py --input ep05.wav --fingerprint-db fingerprints.sqlite
+"""
+import os
+import sys
+import json
+import sqlite3
+import argparse
+
+import numpy as np
+from faster_whisper import decode_audio
+
+from whisper import format_time, read_srt_file
+
+DEFAULT_DB = "fingerprints.sqlite"
+
+# Spektrogram: 8 kHz cukup untuk puncak musik/suara dan 2x lebih murah dari 16 kHz
+FP_SAMPLE_RATE = 8000
+FP_N_FFT = 1024
+FP_HOP = 256
+FRAME_SECONDS = FP_HOP / FP_SAMPLE_RATE
+# Bin frekuensi yang dipakai (buang DC/rumble di bawah ~80 Hz)
+FP_MIN_BIN = 10
+FP_MAX_BIN = FP_N_FFT // 2
+# Puncak = maksimum lokal di neighbourhood (±frame, ±bin), dibatasi per detik
+PEAK_TIME_RADIUS = 8
+PEAK_FREQ_RADIUS = 12
+PEAKS_PER_SECOND = 30
+# Puncak dicari per blok waktu (detik utuh) agar memori tidak tumbuh dengan panjang episode
+PEAK_BLOCK_SECONDS = 128
+# Jumlah frame sampel untuk median ambang puncak (klip pendek: semua frame)
+MEDIAN_SAMPLE_FRAMES = 4096
+# Pasangan anchor -> target: target dalam 1..TARGET_FRAMES frame setelahnya
+FAN_OUT = 5
+TARGET_FRAMES = 63
+TARGET_FREQ_RADIUS = 128
+# Kuantisasi bin dan jarak frame di dalam hash: grid hop episode dan klip tidak
+# pernah sejajar persis, jadi puncak bergeser ±1 bin/frame
+HASH_FREQ_STEP = 2
+HASH_DT_STEP = 4
+
+# Kecocokan: jumlah hash minimal yang sejajar pada offset yang sama
+MIN_MATCH_HASHES = 25
+MIN_MATCH_SECONDS = 5.0
+# Toleransi jitter offset (frame) saat menjumlah hash yang sejajar
+OFFSET_TOLERANCE = 2
+# Region yang berakhir dekat ujung klip referensi diperluas sampai ujung klip
+EDGE_SLACK_SECONDS = 3.0
+# Cue tersimpan dipakai jika berada di dalam region (dengan toleransi ini)
+CUE_TOLERANCE_SECONDS = 0.5
+
+INDEX_SCHEMA = """
+CREATE TABLE IF NOT EXISTS clips (
+    id       INTEGER PRIMARY KEY,
+    tag      TEXT NOT NULL UNIQUE,
+    path     TEXT NOT NULL,
+    duration REAL NOT NULL,
+    added_at REAL NOT NULL DEFAULT (strftime('%s', 'now'))
+);
+CREATE TABLE IF NOT EXISTS cues (
+    clip_id INTEGER NOT NULL REFERENCES clips (id) ON DELETE CASCADE,
+    lang    TEXT NOT NULL,
+    cues    TEXT NOT NULL,
+    PRIMARY KEY (clip_id, lang)
+);
+CREATE TABLE IF NOT EXISTS hashes (
+    hash    INTEGER NOT NULL,
+    clip_id INTEGER NOT NULL REFERENCES clips (id) ON DELETE CASCADE,
+    frame   INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS hashes_hash ON hashes (hash);
+"""
+
+def connect_index(db_path=DEFAULT_DB):
+    """Open (and create if needed) the fingerprint index."""
+    conn = sqlite3.connect(db_path)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA foreign_keys=ON")
+    conn.executescript(INDEX_SCHEMA)
+    return conn
+
+def load_fingerprint_audio(path):
+    """Decode any audio file to mono float32 at FP_SAMPLE_RATE."""
+    return decode_audio(path, sampling_rate=FP_SAMPLE_RATE)
+
+def spectrogram(audio):
+    """Log-magnitude STFT, shape (frames, bins), float32."""
+    if len(audio) < FP_N_FFT:
+        return np.zeros((0, FP_MAX_BIN - FP_MIN_BIN), dtype=np.float32)
+    frames = np.lib.stride_tricks.sliding_window_view(audio, FP_N_FFT)[::FP_HOP]
+    window = np.hanning(FP_N_FFT).astype(np.float32)
+    spec = np.empty((len(frames), FP_MAX_BIN - FP_MIN_BIN), dtype=np.float32)
+    # Per blok agar memori tetap kecil untuk episode panjang
+    for i in range(0, len(frames), 4096):
+        magnitude = np.abs(np.fft.rfft(frames[i:i + 4096] * window, axis=1))[:, FP_MIN_BIN:FP_MAX_BIN]
+        spec[i:i + 4096] = np.log(magnitude + 1e-6)
+    return spec
+
+def local_max_filter(spec, time_radius, freq_radius):
+    """Separable sliding maximum over (±time_radius, ±freq_radius).
+
+    Each shift is an in-place np.maximum between offset slices, so there
+    is no wrap-around and no per-shift copy of the array.
+    """
+    result = spec.copy()
+    for axis, radius in ((0, time_radius), (1, freq_radius)):
+        source = result.copy()
+        # Transposed views so both axes are handled as the first one
+        out, src = (result, source) if axis == 0 else (result.T, source.T)
+        for shift in range(1, radius + 1):
+            np.maximum(out[shift:], src[:-shift], out=out[shift:])
+            np.maximum(out[:-shift], src[shift:], out=out[:-shift])
+    return result
+
+def find_peaks(spec):
+    """Spectral peaks as (frame, bin) arrays, strongest PEAKS_PER_SECOND per second.
+
+    The spectrogram is filtered in blocks of whole seconds that overlap by
+    PEAK_TIME_RADIUS frames, so memory stays bounded for long episodes and
+    the result is the same as filtering the whole array at once.
+    """
+    if not len(spec):
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+    # Puncak di area hening (di bawah median) hanya noise; median dari sampel frame untuk episode panjang
+    threshold = np.median(spec[::max(1, len(spec) // MEDIAN_SAMPLE_FRAMES)])
+
+    frames_per_second = int(round(1 / FRAME_SECONDS))
+    block_frames = PEAK_BLOCK_SECONDS * frames_per_second
+    all_frames, all_bins = [], []
+    for start in range(0, len(spec), block_frames):
+        lo = max(0, start - PEAK_TIME_RADIUS)
+        block = spec[lo:start + block_frames + PEAK_TIME_RADIUS]
+        is_peak = (block == local_max_filter(block, PEAK_TIME_RADIUS, PEAK_FREQ_RADIUS))
+        is_peak &= block > threshold
+        frames, bins = np.nonzero(is_peak[start - lo:start - lo + block_frames])
+        frames += start
+        strength = spec[frames, bins]
+
+        # Blok berisi detik utuh, jadi batas per detik bisa dihitung per blok
+        keep = []
+        second = frames // frames_per_second
+        for s in np.unique(second):
+            idx = np.nonzero(second == s)[0]
+            if len(idx) > PEAKS_PER_SECOND:
+                idx = idx[np.argsort(strength[idx])[-PEAKS_PER_SECOND:]]
+            keep.append(idx)
+        if keep:
+            keep = np.sort(np.concatenate(keep))
+            all_frames.append(frames[keep])
+            all_bins.append(bins[keep])
+    if not all_frames:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+    return np.concatenate(all_frames), np.concatenate(all_bins)
+
+def audio_fingerprint(audio):
+    """Landmark hashes of an audio array; returns a list of (hash, anchor frame).
+
+    Each hash packs (anchor bin, target bin, frame delta) of a pair of
+    nearby spectral peaks, so it is invariant to where the clip starts
+    in the file and robust to moderate noise and level changes.
+    """
+    frames, bins = find_peaks(spectrogram(audio))
+    hashes = []
+    for i in range(len(frames)):
+        f1, t1 = int(bins[i]), int(frames[i])
+        paired = 0
+        for j in range(i + 1, len(frames)):
+            dt = int(frames[j]) - t1
+            if dt > TARGET_FRAMES:
+                break
+            if dt < 1 or abs(int(bins[j]) - f1) > TARGET_FREQ_RADIUS:
+                continue
+            hashes.append((
+                ((f1 // HASH_FREQ_STEP) << 16) | ((int(bins[j]) // HASH_FREQ_STEP) << 6) | (dt // HASH_DT_STEP),
+                t1
+            ))
+            paired += 1
+            if paired >= FAN_OUT:
+                break
+    return hashes
+
+def add_reference(conn, tag, audio_path, cue_files):
+    """Fingerprint a reference clip and store it with its subtitle cues.
+
+    `cue_files` maps a language code ("ja", "id", ...) to an SRT aligned to
+    the clip (timestamps relative to the clip start). An existing clip with
+    the same tag is replaced.
+    """
+    audio = load_fingerprint_audio(audio_path)
+    hashes = audio_fingerprint(audio)
+    duration = len(audio) / FP_SAMPLE_RATE
+
+    with conn:
+        conn.execute("DELETE FROM clips WHERE tag = ?", (tag,))
+        clip_id = conn.execute(
+            "INSERT INTO clips (tag, path, duration) VALUES (?, ?, ?)",
+            (tag, os.path.abspath(audio_path), duration)
+        ).lastrowid
+        conn.executemany("INSERT INTO hashes (hash, clip_id, frame) VALUES (?, ?, ?)",
+                         ((h, clip_id, frame) for h, frame in hashes))
+        for lang, srt_path in cue_files.items():
+            cues = read_srt_file(srt_path)
+            conn.execute("INSERT INTO cues (clip_id, lang, cues) VALUES (?, ?, ?)",
+                         (clip_id, lang, json.dumps(cues, ensure_ascii=False)))
+    return clip_id, duration, len(hashes)
+
+def offset_votes(conn, hashes):
+    """Count query hashes agreeing on each (clip, frame offset)."""
+    conn.execute("CREATE TEMP TABLE IF NOT EXISTS query (hash INTEGER NOT NULL, frame INTEGER NOT NULL)")
+    conn.execute("DELETE FROM query")
+    conn.executemany("INSERT INTO query (hash, frame) VALUES (?, ?)", hashes)
+    rows = conn.execute("""
+        SELECT h.clip_id, q.frame - h.frame AS delta, COUNT(*) AS votes,
+               MIN(h.frame) AS ref_first, MAX(h.frame) AS ref_last
+        FROM query q JOIN hashes h ON h.hash = q.hash
+        GROUP BY h.clip_id, delta
+        HAVING votes >= 2
+    """).fetchall()
+    conn.execute("DELETE FROM query")
+    return rows
+
+def find_matches(conn, audio):
+    """Locate every occurrence of a reference clip in `audio` (FP_SAMPLE_RATE).
+
+    Returns non-overlapping matches sorted by start time, each a dict with
+    clip_id, tag, start/end (seconds in the query), offset (seconds to add
+    to reference time), ref_start/ref_end (matched part of the clip) and
+    votes.
+    """
+    clips = {row['id']: row for row in conn.execute("SELECT id, tag, duration FROM clips")}
+    if not clips:
+        return []
+    hashes = audio_fingerprint(audio)
+    if not hashes:
+        return []
+    audio_duration = len(audio) / FP_SAMPLE_RATE
+
+    by_clip = {}
+    for row in offset_votes(conn, hashes):
+        by_clip.setdefault(row['clip_id'], {})[row['delta']] = row
+
+    candidates = []
+    for clip_id, deltas in by_clip.items():
+        clip = clips[clip_id]
+        for delta in sorted(deltas, key=lambda d: -deltas[d]['votes']):
+            near = [deltas[d] for d in range(delta - OFFSET_TOLERANCE, delta + OFFSET_TOLERANCE + 1) if d in deltas]
+            votes = sum(row['votes'] for row in near)
+            if votes < MIN_MATCH_HASHES:
+                break
+
+            ref_start = min(row['ref_first'] for row in near) * FRAME_SECONDS
+            ref_end = (max(row['ref_last'] for row in near) + 1) * FRAME_SECONDS
+            # Hash hanya ada di puncak; perluas ke tepi klip jika kecocokan sudah dekat tepi
+            if ref_start <= EDGE_SLACK_SECONDS:
+                ref_start = 0.0
+            if clip['duration'] - ref_end <= EDGE_SLACK_SECONDS:
+                ref_end = clip['duration']
+
+            offset = delta * FRAME_SECONDS
+            start = max(0.0, offset + ref_start)
+            end = min(audio_duration, offset + ref_end)
+            if end - start < MIN_MATCH_SECONDS:
+                continue
+            candidates.append({
+                'clip_id': clip_id,
+                'tag': clip['tag'],
+                'start': start,
+                'end': end,
+                'offset': offset,
+                'ref_start': start - offset,
+                'ref_end': end - offset,
+                'votes': votes,
+            })
+
+    # Region bertumpuk: yang paling banyak hash sejajarnya menang
+    matches = []
+    for cand in sorted(candidates, key=lambda c: -c['votes']):
+        if all(cand['end'] <= m['start'] or cand['start'] >= m['end'] for m in matches):
+            matches.append(cand)
+    return sorted(matches, key=lambda m: m['start'])
+
+def stored_cues(conn, clip_id, lang):
+    row = conn.execute("SELECT cues FROM cues WHERE clip_id = ? AND lang = ?", (clip_id, lang)).fetchone()
+    return json.loads(row['cues']) if row else None
+
+def shift_cues(cues, match):
+    """Cues of the matched part of the clip, moved to the match offset."""
+    shifted = []
+    for cue in cues:
+        if (cue['start'] < match['ref_start'] - CUE_TOLERANCE_SECONDS
+                or cue['end'] > match['ref_end'] + CUE_TOLERANCE_SECONDS):
+            continue
+        shifted.append({
+            'start': max(match['start'], cue['start'] + match['offset']),
+            'end': min(match['end'], cue['end'] + match['offset']),
+            'text': cue['text'],
+        })
+    return shifted
+
+def known_regions(db_path, audio_path, langs):
+    """Matched regions of `audio_path` that can skip ASR for every language in `langs`.
+
+    Each region carries 'cues': {lang: shifted cues}. Matches whose clip has
+    no stored cues for one of the languages are not skipped (a warning is
+    printed) because their subtitles would otherwise be lost.
+    """
+    conn = connect_index(db_path)
+    try:
+        matches = find_matches(conn, load_fingerprint_audio(audio_path))
+        regions = []
+        for match in matches:
+            cues = {lang: stored_cues(conn, match['clip_id'], lang) for lang in langs}
+            missing = [lang for lang, lang_cues in cues.items() if lang_cues is None]
+            if missing:
+                print(f"  Warning: '{match['tag']}' cocok di {format_time(match['start'])}, tetapi tidak punya "
+                      f"cue untuk bahasa {', '.join(missing)}; region tetap di-decode")
+                continue
+            regions.append({**match, 'cues': {lang: shift_cues(lang_cues, match) for lang, lang_cues in cues.items()}})
+    finally:
+        conn.close()
+
+    skipped = sum(r['end'] - r['start'] for r in regions)
+    for r in regions:
+        print(f"  Fingerprint: '{r['tag']}' di {format_time(r['start'])} - {format_time(r['end'])} "
+              f"({r['end'] - r['start']:.1f} detik, {r['votes']} hash)")
+    print(f"Fingerprint: {len(regions)} region dikenali, {skipped:.1f} detik audio dilewati")
+    return regions
+
+def print_clips(conn):
+    rows = conn.execute("""
+        SELECT c.id, c.tag, c.duration, c.path,
+               (SELECT COUNT(*) FROM hashes h WHERE h.clip_id = c.id) AS hashes,
+               (SELECT GROUP_CONCAT(lang, ',') FROM cues q WHERE q.clip_id = c.id) AS langs
+        FROM clips c ORDER BY c.tag
+    """).fetchall()
+    if not rows:
+        print("Indeks kosong.")
+        return
+    print(f"{'Tag':<20} {'Durasi':>8} {'Hash':>8}  {'Bahasa':<12} Path")
+    for row in rows:
+        print(f"{row['tag']:<20} {row['duration']:>7.1f}s {row['hashes']:>8}  {row['langs'] or '-':<12} {row['path']}")
+
+def parse_cue_files(values):
+    """--srt lang=path arguments into {lang: path}."""
+    cue_files = {}
+    for value in values or []:
+        lang, sep, path = value.partition("=")
+        if not sep or not lang or not path:
+            raise ValueError(f"format --srt harus <bahasa>=<file.srt>, bukan '{value}'")
+        if not os.path.exists(path):
+            raise ValueError(f"file {path} tidak ditemukan")
+        cue_files[lang] = path
+    return cue_files
+
+def main():
+    parser = argparse.ArgumentParser(description="Indeks fingerprint audio untuk opening/ending/jingle yang berulang")
+    parser.add_argument("--db", default=DEFAULT_DB, help=f"File SQLite indeks (default: {DEFAULT_DB})")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    add = sub.add_parser("add", help="Daftarkan klip referensi beserta subtitle-nya")
+    add.add_argument("--tag", required=True, help="Nama unik klip (mis. opening-s2); tag yang sama diganti")
+    add.add_argument("--audio", required=True, help="File audio klip referensi")
+    add.add_argument("--srt", action="append", metavar="LANG=FILE",
+                     help="Subtitle klip per bahasa, waktu relatif ke awal klip (bisa diulang, mis. ja=op_ja.srt)")
+
+    sub.add_parser("list", help="Tampilkan klip di indeks")
+
+    remove = sub.add_parser("remove", help="Hapus klip dari indeks")
+    remove.add_argument("--tag", required=True, help="Tag klip yang dihapus")
+
+    match = sub.add_parser("match", help="Cari klip yang dikenal di file audio")
+    match.add_argument("--audio", required=True, help="File audio episode")
+    match.add_argument("--json", action="store_true", help="Output dalam format JSON")
+
+    args = parser.parse_args()
+    conn = connect_index(args.db)
+
+    if args.command == "add":
+        try:
+            cue_files = parse_cue_files(args.srt)
+        except ValueError as e:
+            print(f"Error: {e}")
+            return 1
+        if not cue_files:
+            print("Warning: tidak ada --srt; klip akan dikenali tetapi tidak pernah dilewati saat ASR")
+        clip_id, duration, n_hashes = add_reference(conn, args.tag, args.audio, cue_files)
+        print(f"✓ '{args.tag}' ditambahkan: {duration:.1f} detik, {n_hashes} hash, "
+              f"bahasa: {', '.join(cue_files) or '-'}")
+
+    elif args.command == "list":
+        print_clips(conn)
+
+    elif args.command == "remove":
+        with conn:
+            deleted = conn.execute("DELETE FROM clips WHERE tag = ?", (args.tag,)).rowcount
+        print(f"✓ '{args.tag}' dihapus" if deleted else f"Tag '{args.tag}' tidak ada di indeks")
+
+    elif args.command == "match":
+        matches = find_matches(conn, load_fingerprint_audio(args.audio))
+        if args.json:
+            print(json.dumps(matches, indent=2, ensure_ascii=False))
+        else:
+            for m in matches:
+                print(f"{m['tag']:<20} {format_time(m['start'])} - {format_time(m['end'])} "
+                      f"(klip {m['ref_start']:.1f}-{m['ref_end']:.1f}s, {m['votes']} hash)")
+            print(f"Total: {len(matches)} region, {sum(m['end'] - m['start'] for m in matches):.1f} detik")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
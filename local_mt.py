@@ -0,0 +1,151 @@
+"""
+Translator lokal (offline) berbasis CTranslate2 sebagai alternatif GPT.
+
+Model seq2seq Jepang -> bahasa target (NLLB, M2M100 atau Marian) dikonversi ke
+CTranslate2 beserta file tokenizer-nya, mis.:
+
+    ct2-transformers-converter --model facebook/nllb-200-distilled-600M \
+        --output_dir models/nllb-600m-ct2 --quantization int8 \
+        --copy_files tokenizer.json tokenizer_config.json special_tokens_map.json
+
+Dipakai lewat `whisper.py --translator local --mt-model models/nllb-600m-ct2`.
+Model Marian (mis. opus-mt-ja-en) hanya punya satu arah; bahasa targetnya dibaca
+dari tokenizer_config.json atau ditentukan dengan `--mt-target-lang`.
+Hasilnya deterministik (beam search tanpa sampling) dan tidak butuh jaringan.
+"""
+import re
+import time
+import threading
+
+# Token bahasa per keluarga model multibahasa: NLLB (FLORES-200) dan M2M100 (__xx__).
+# Model Marian hanya punya satu arah dan tidak memakai token bahasa.
+NLLB_LANG_CODES = {
+    "ja": "jpn_Jpan",
+    "id": "ind_Latn",
+    "en": "eng_Latn",
+    "ms": "zsm_Latn",
+}
+M2M100_LANG_CODES = {
+    "ja": "__ja__",
+    "id": "__id__",
+    "en": "__en__",
+    "ms": "__ms__",
+}
+
+MT_BEAM_SIZE = 2
+# Dynamic batching: batch dibentuk per jumlah token (input diurutkan per panjang oleh CTranslate2)
+MT_MAX_BATCH_TOKENS = 2048
+MT_MAX_DECODING_LENGTH = 256
+
+class LocalTranslator:
+    """Batched CTranslate2 seq2seq translator for subtitle segments.
+
+    All segments of a file are sent in one translate_batch call with a
+    token budget per batch; CTranslate2 sorts them by length and splits
+    them so padding is minimal. Throughput counters are kept for
+    print_stats(), like ChatRequester.
+    """
+
+    def __init__(self, model_dir, device="cpu", compute_type="int8", beam_size=MT_BEAM_SIZE,
+                 max_batch_tokens=MT_MAX_BATCH_TOKENS, threads=0, model_target_lang=None):
+        import ctranslate2
+        from transformers import AutoTokenizer
+
+        self.model_dir = model_dir
+        self.translator = ctranslate2.Translator(model_dir, device=device, compute_type=compute_type,
+                                                 intra_threads=threads)
+        self.tokenizer = AutoTokenizer.from_pretrained(model_dir)
+        self.vocab = self.tokenizer.get_vocab()
+        self.lang_codes = None
+        for codes in (NLLB_LANG_CODES, M2M100_LANG_CODES):
+            if any(code in self.vocab for code in codes.values()):
+                self.lang_codes = codes
+                break
+        # Marian: the single target language, from the caller or the tokenizer config (opus-mt models)
+        self.model_target_lang = model_target_lang or getattr(self.tokenizer, 'target_lang', None)
+        self.beam_size = beam_size
+        self.max_batch_tokens = max_batch_tokens
+        self.lock = threading.Lock()
+        self.stats = {'segments': 0, 'seconds': 0.0}
+
+    def lang_token(self, lang):
+        """The language token for `lang` in this model's family if the vocabulary has it, else None."""
+        if self.lang_codes is None:
+            return None
+        token = self.lang_codes.get(lang)
+        return token if token in self.vocab else None
+
+    def check_target_lang(self, target_lang, source_lang="ja"):
+        """Raise ValueError unless the model can translate source_lang into target_lang."""
+        if self.lang_codes is not None:
+            for lang in (source_lang, target_lang):
+                if self.lang_token(lang) is None:
+                    raise ValueError(f"model {self.model_dir} tidak mendukung bahasa '{lang}'")
+            return
+        if self.model_target_lang is None:
+            raise ValueError(f"model {self.model_dir} tidak punya token bahasa dan bahasa targetnya tidak diketahui "
+                             f"(tentukan dengan --mt-target-lang)")
+        if target_lang != self.model_target_lang:
+            raise ValueError(f"model {self.model_dir} hanya menerjemahkan ke '{self.model_target_lang}', "
+                             f"bukan '{target_lang}'")
+
+    def encode(self, text, source_token):
+        tokens = self.tokenizer.convert_ids_to_tokens(self.tokenizer.encode(text, add_special_tokens=False))
+        if source_token:
+            tokens = [source_token] + tokens
+        return tokens + [self.tokenizer.eos_token]
+
+    def decode(self, tokens):
+        ids = self.tokenizer.convert_tokens_to_ids(tokens)
+        return self.tokenizer.decode(ids, skip_special_tokens=True).strip()
+
+    def translate_texts(self, texts, target_lang="id", source_lang="ja"):
+        """Translate a list of strings; empty strings stay empty."""
+        # Model multibahasa butuh token bahasa sumber + target; Marian hanya punya satu arah
+        self.check_target_lang(target_lang, source_lang)
+        source_token = self.lang_token(source_lang)
+        target_token = self.lang_token(target_lang)
+
+        indices = [i for i, text in enumerate(texts) if text.strip()]
+        translations = [''] * len(texts)
+        if not indices:
+            return translations
+
+        t0 = time.perf_counter()
+        results = self.translator.translate_batch(
+            [self.encode(texts[i], source_token) for i in indices],
+            target_prefix=[[target_token]] * len(indices) if target_token else None,
+            max_batch_size=self.max_batch_tokens,
+            batch_type="tokens",
+            beam_size=self.beam_size,
+            max_decoding_length=MT_MAX_DECODING_LENGTH,
+        )
+        elapsed = time.perf_counter() - t0
+
+        for i, result in zip(indices, results):
+            translations[i] = self.decode(result.hypotheses[0])
+        with self.lock:
+            self.stats['segments'] += len(indices)
+            self.stats['seconds'] += elapsed
+        return translations
+
+    def translate_segments(self, segments, target_lang="id", label="Dialog", batch_start=0):
+        """Translate segments, falling back to the original text when a translation is empty."""
+        # Remove null bytes and control characters, same as build_batch_text
+        texts = [re.sub(r'[\x00-\x08\x0b\x0c\x0e-\x1f\x7f]', '', seg['text']) for seg in segments]
+        translations = self.translate_texts(texts, target_lang)
+
+        translated_segments = []
+        for i, (seg, translated) in enumerate(zip(segments, translations)):
+            if not translated:
+                print(f"  Warning: {label} {batch_start + i + 1} gagal diterjemahkan, menggunakan text original")
+                translated = seg['text']
+            translated_segments.append({'start': seg['start'], 'end': seg['end'], 'text': translated})
+        return translated_segments
+
+    def print_stats(self):
+        stats = self.stats
+        if not stats['segments']:
+            return
+        rate = stats['segments'] / stats['seconds'] if stats['seconds'] else 0.0
+        print(f"  Translasi lokal: {stats['segments']} segmen dalam {stats['seconds']:.1f}s ({rate:.1f} segmen/detik)")
@@ -0,0 +1,248 @@
+#!/usr/bin/env python3
+"""
+Mock server OpenAI-compatible kecil untuk menguji request translasi tanpa jaringan.
+
+Endpoint /chat/completions: setiap baris "[Dialog N] teks" dijawab
+"[Dialog N] mock: teks", jadi parser batch tetap jalan. Gangguan bisa
+disuntikkan secara deterministik lewat antrian `faults`, satu per request
+sesuai urutan datang:
+
+    ok     - jawab normal
+    slow   - tunggu --slow-seconds lalu jawab (untuk timeout / hedging)
+    500    - HTTP 500
+    429    - HTTP 429 (rate limit)
+    400    - HTTP 400 (tidak boleh di-retry)
+
+Batch API: /files (upload + /files/{id}/content) dan /batches (create +
+retrieve). Job batch selesai setelah --batch-polls kali di-retrieve; baris
+dengan custom_id di --fail-custom-ids dijawab status 500.
+
+Contoh:
+    python mock_openai.py --port 8800 --faults slow,500,429
+    python whisper.py --method translate-srt --input sub.srt --output out.srt \
+        --api_key mock --base-url http://127.0.0.1:8800/v1
+"""
+import re
+import json
+import time
+import argparse
+import threading
+from collections import deque
+from email.parser import BytesParser
+from email.policy import HTTP
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+FAULTS = ("ok", "slow", "500", "429", "400")
+SLOW_SECONDS = 2.0
+# Jumlah retrieve sebelum job batch berstatus completed
+BATCH_POLLS = 2
+
+def echo_translation(body):
+    """Echo every '[Label N] text' line of the last message back as '[Label N] mock: text'."""
+    content = body['messages'][-1]['content']
+    return "\n".join(re.sub(r'^(\[\w+ \d+\]) ', r'\1 mock: ', line)
+                     for line in re.findall(r'^\[\w+ \d+\] .*$', content, re.M))
+
+def completion(content):
+    return {
+        "id": "chatcmpl-mock",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": "mock",
+        "choices": [{"index": 0, "finish_reason": "stop", "message": {"role": "assistant", "content": content}}],
+        "usage": {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0},
+    }
+
+def upload_content(content_type, data):
+    """Bytes of the uploaded file in a multipart/form-data body."""
+    message = BytesParser(policy=HTTP).parsebytes(f"Content-Type: {content_type}\r\n\r\n".encode() + data)
+    for part in message.iter_parts():
+        if part.get_filename():
+            return part.get_payload(decode=True)
+    return b""
+
+def batch_output_line(request, failed):
+    """One line of a batch output file for an input request line."""
+    if failed:
+        response = {"status_code": 500, "request_id": "mock", "body": {"error": {"message": "mock 500"}}}
+        error = {"code": "server_error", "message": "mock 500"}
+    else:
+        response = {"status_code": 200, "request_id": "mock", "body": completion(echo_translation(request['body']))}
+        error = None
+    return json.dumps({"id": f"batch_req_{request['custom_id']}", "custom_id": request['custom_id'],
+                       "response": response, "error": error}, ensure_ascii=False)
+
+class MockOpenAIServer:
+    """Threaded mock of /chat/completions, /files and /batches with injected faults.
+
+    `faults` is consumed one entry per chat request in arrival order; once
+    it is empty every request succeeds after `delay` seconds. `requests`
+    counts the chat requests received. Batch jobs complete after
+    `batch_polls` retrieves; lines whose custom_id is in
+    `fail_custom_ids` come back with status 500.
+    """
+
+    def __init__(self, port=0, delay=0.0, slow_seconds=SLOW_SECONDS, faults=(), batch_polls=BATCH_POLLS,
+                 fail_custom_ids=()):
+        self.delay = delay
+        self.slow_seconds = slow_seconds
+        self.faults = deque(faults)
+        self.requests = 0
+        self.batch_polls = batch_polls
+        self.fail_custom_ids = set(fail_custom_ids)
+        self.files = {}
+        self.batches = {}
+        self.lock = threading.Lock()
+        self.httpd = ThreadingHTTPServer(('127.0.0.1', port), self.make_handler())
+        self.httpd.daemon_threads = True
+        self.thread = None
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.httpd.server_address[1]}/v1"
+
+    def next_fault(self):
+        with self.lock:
+            self.requests += 1
+            return self.faults.popleft() if self.faults else "ok"
+
+    def add_file(self, filename, content):
+        with self.lock:
+            file_id = f"file-mock{len(self.files)}"
+            self.files[file_id] = content
+        return {"id": file_id, "object": "file", "bytes": len(content), "created_at": int(time.time()),
+                "filename": filename, "purpose": "batch", "status": "processed"}
+
+    def create_batch(self, body):
+        lines = [json.loads(line) for line in self.files[body['input_file_id']].decode("utf-8").splitlines()
+                 if line.strip()]
+        output = "\n".join(batch_output_line(request, request['custom_id'] in self.fail_custom_ids)
+                           for request in lines) + "\n"
+        output_file_id = self.add_file("batch_output.jsonl", output.encode("utf-8"))['id']
+        failed = sum(request['custom_id'] in self.fail_custom_ids for request in lines)
+        with self.lock:
+            batch_id = f"batch_mock{len(self.batches)}"
+            self.batches[batch_id] = {
+                "id": batch_id,
+                "object": "batch",
+                "endpoint": body['endpoint'],
+                "input_file_id": body['input_file_id'],
+                "completion_window": body['completion_window'],
+                "status": "in_progress",
+                "created_at": int(time.time()),
+                "output_file_id": None,
+                "request_counts": {"total": len(lines), "completed": 0, "failed": 0},
+                "polls": 0,
+                "result": (output_file_id, len(lines) - failed, failed),
+            }
+            return self.batch_object(batch_id)
+
+    def retrieve_batch(self, batch_id):
+        with self.lock:
+            batch = self.batches[batch_id]
+            batch['polls'] += 1
+            if batch['polls'] >= self.batch_polls and batch['status'] == "in_progress":
+                output_file_id, completed, failed = batch['result']
+                batch.update(status="completed", output_file_id=output_file_id,
+                             request_counts={"total": completed + failed, "completed": completed, "failed": failed})
+            return self.batch_object(batch_id)
+
+    def batch_object(self, batch_id):
+        return {key: value for key, value in self.batches[batch_id].items() if key not in ("polls", "result")}
+
+    def make_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def send_json(self, obj, status=200):
+                data = json.dumps(obj).encode()
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def not_found(self):
+                self.send_json({"error": {"message": f"mock: {self.path} tidak ada"}}, 404)
+
+            def do_GET(self):
+                match = re.search(r'/files/([\w-]+)/content$', self.path)
+                if match and match.group(1) in server.files:
+                    data = server.files[match.group(1)]
+                    self.send_response(200)
+                    self.send_header('Content-Type', 'application/octet-stream')
+                    self.send_header('Content-Length', str(len(data)))
+                    self.end_headers()
+                    return self.wfile.write(data)
+                match = re.search(r'/batches/([\w-]+)$', self.path)
+                if match and match.group(1) in server.batches:
+                    return self.send_json(server.retrieve_batch(match.group(1)))
+                self.not_found()
+
+            def do_POST(self):
+                data = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+                if self.path.endswith('/files'):
+                    return self.send_json(server.add_file("batch_input.jsonl",
+                                                          upload_content(self.headers['Content-Type'], data)))
+                body = json.loads(data or b"{}")
+                if self.path.endswith('/batches'):
+                    if body.get('input_file_id') not in server.files:
+                        return self.send_json({"error": {"message": "input_file_id tidak dikenal"}}, 400)
+                    return self.send_json(server.create_batch(body))
+                if not self.path.endswith('/chat/completions'):
+                    return self.not_found()
+
+                fault = server.next_fault()
+                if fault in ("500", "429", "400"):
+                    return self.send_json({"error": {"message": f"mock {fault}", "type": "mock"}}, int(fault))
+                time.sleep(server.slow_seconds if fault == "slow" else server.delay)
+                try:
+                    self.send_json(completion(echo_translation(body)))
+                except (BrokenPipeError, ConnectionResetError):
+                    pass  # Client sudah timeout / hedge lain sudah menang
+
+        return Handler
+
+    def start(self):
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+def main():
+    parser = argparse.ArgumentParser(description="Mock server OpenAI-compatible untuk uji timeout, retry, hedging dan Batch API")
+    parser.add_argument("--port", type=int, default=8800, help="Port (default: 8800)")
+    parser.add_argument("--delay", type=float, default=0.0, help="Latency jawaban normal dalam detik (default: 0)")
+    parser.add_argument("--slow-seconds", type=float, default=SLOW_SECONDS,
+                        help=f"Latency untuk fault 'slow' (default: {SLOW_SECONDS})")
+    parser.add_argument("--faults", default="",
+                        help=f"Urutan fault per request, dipisah koma ({', '.join(FAULTS)})")
+    parser.add_argument("--batch-polls", type=int, default=BATCH_POLLS,
+                        help=f"Jumlah retrieve sebelum job batch selesai (default: {BATCH_POLLS})")
+    parser.add_argument("--fail-custom-ids", default="",
+                        help="custom_id baris batch yang dijawab status 500, dipisah koma (mis. 0:5)")
+    args = parser.parse_args()
+
+    faults = [fault.strip() for fault in args.faults.split(',') if fault.strip()]
+    unknown = [fault for fault in faults if fault not in FAULTS]
+    if unknown:
+        parser.error(f"fault tidak dikenal: {', '.join(unknown)}")
+
+    fail_custom_ids = [custom_id.strip() for custom_id in args.fail_custom_ids.split(',') if custom_id.strip()]
+    server = MockOpenAIServer(args.port, args.delay, args.slow_seconds, faults, args.batch_polls, fail_custom_ids)
+    print(f"Mock OpenAI server di {server.url}")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.httpd.server_close()
+
+if __name__ == "__main__":
+    main()
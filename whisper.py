@@ -1,12 +1,24 @@
 import os
 import json
 import time
+import bisect
 import re
+import zlib
+import difflib
+from collections import deque
 from datetime import timedelta
+import random
 import argparse
+import threading
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+import openai
 from openai import OpenAI
 import configparser
-from faster_whisper import WhisperModel
+from faster_whisper import WhisperModel, decode_audio
+
+from local_mt import MT_BEAM_SIZE, MT_MAX_BATCH_TOKENS, LocalTranslator
+
+SAMPLE_RATE = 16000
 
 # Fungsi untuk mengubah detik ke format waktu SRT (HH:MM:SS,mmm)
 def format_time(seconds):
@@ -95,6 +107,186 @@ TRANSLATION_SYSTEM_PROMPT = (
     "Pertahankan format [Dialog X] agar bisa dicocokkan kembali."
 )
 
+# Prompt per bahasa target; bisa ditambah/ditimpa lewat section [PROMPTS] di config.ini
+TRANSLATION_PROMPTS = {
+    "id": TRANSLATION_SYSTEM_PROMPT,
+    "en": (
+        "You are a subtitle translator from Japanese to English. "
+        "Translate every line marked [Dialog X] into English.\n\n"
+        "Style rules:\n"
+        "- Natural, casual spoken English, like an anime fansub\n"
+        "- Keep lines short and easy to read on screen\n"
+        "- Keep honorifics (-san, -kun, -chan, senpai) as they are\n"
+        "- Keep context between lines so the story flows\n\n"
+        "Keep the [Dialog X] markers so the lines can be matched back."
+    ),
+    "ms": (
+        "You are a subtitle translator from Japanese to Malay (Bahasa Melayu, Malaysia). "
+        "Translate every line marked [Dialog X] into Malay.\n\n"
+        "Style rules:\n"
+        "- Use Malaysian Malay spelling and vocabulary, not Indonesian\n"
+        "- Use \"aku/kau\" for casual speech between friends\n"
+        "- Casual conversational tone, short and natural like an anime fansub\n"
+        "- Keep context between lines so the story flows\n\n"
+        "Keep the [Dialog X] markers so the lines can be matched back."
+    ),
+}
+
+LANGUAGE_NAMES = {
+    "id": "Indonesia",
+    "en": "Inggris",
+    "ms": "Melayu",
+}
+
+MULTI_LANG_PROMPT = (
+    "Kamu adalah penerjemah subtitle dari bahasa Jepang. "
+    "Terjemahkan setiap dialog dalam tanda [Dialog X] ke semua bahasa berikut: {languages}.\n\n"
+    "Aturan gaya per bahasa:\n\n{rules}\n\n"
+    "Jawab HANYA dengan objek JSON dengan kode bahasa sebagai key, lalu nomor dialog sebagai key "
+    "di dalamnya, contoh: {example}"
+)
+
+# Deadline, retry dan hedging untuk request translasi
+REQUEST_TIMEOUT = 60
+REQUEST_RETRIES = 3
+RETRY_BACKOFF_BASE = 1.0
+RETRY_BACKOFF_MAX = 30.0
+# Hedging baru aktif setelah ada cukup sampel latency untuk menghitung p95
+HEDGE_MIN_SAMPLES = 5
+HEDGE_QUANTILE = 0.95
+# Maksimal request duplikat (hedge) sebagai fraksi dari request utama
+HEDGE_BUDGET = 0.1
+
+def is_retryable_error(error):
+    """Timeouts, connection errors, 408/409/429 and 5xx are worth retrying."""
+    if isinstance(error, (openai.APITimeoutError, openai.APIConnectionError)):
+        return True
+    if isinstance(error, openai.APIStatusError):
+        return error.status_code in (408, 409, 429) or error.status_code >= 500
+    return False
+
+class ChatRequester:
+    """OpenAI client wrapper adding deadlines, retries and optional hedging to chat completions.
+
+    Every chat request gets a hard timeout and is retried with jittered
+    exponential backoff. With `hedge`, a duplicate request is sent when
+    the first one has not returned after the observed p95 latency, and the
+    first answer wins; duplicates are capped at `hedge_budget` times the
+    number of requests. Other attributes (files, batches, ...) are passed
+    through to the wrapped client.
+    """
+
+    def __init__(self, client, timeout=REQUEST_TIMEOUT, retries=REQUEST_RETRIES, hedge=False,
+                 hedge_budget=HEDGE_BUDGET):
+        self.client = client
+        self.chat_client = client.with_options(timeout=timeout, max_retries=0)
+        self.retries = retries
+        self.hedge = hedge
+        self.hedge_budget = hedge_budget
+        self.executor = ThreadPoolExecutor(max_workers=16) if hedge else None
+        self.latencies = deque(maxlen=200)
+        self.lock = threading.Lock()
+        self.stats = {
+            'requests': 0,
+            'attempts': 0,
+            'retries': 0,
+            'timeouts': 0,
+            'errors': 0,
+            'hedges_fired': 0,
+            'hedges_won': 0,
+        }
+
+    def __getattr__(self, name):
+        return getattr(self.client, name)
+
+    def count(self, key, n=1):
+        with self.lock:
+            self.stats[key] += n
+
+    def hedge_delay(self):
+        """Observed latency quantile, or None while there are too few samples."""
+        with self.lock:
+            if len(self.latencies) < HEDGE_MIN_SAMPLES:
+                return None
+            ordered = sorted(self.latencies)
+        return ordered[min(len(ordered) - 1, int(HEDGE_QUANTILE * len(ordered)))]
+
+    def take_hedge_budget(self):
+        with self.lock:
+            if self.stats['hedges_fired'] + 1 > self.hedge_budget * self.stats['requests']:
+                return False
+            self.stats['hedges_fired'] += 1
+            return True
+
+    def timed_call(self, kwargs):
+        self.count('attempts')
+        t0 = time.perf_counter()
+        try:
+            response = self.chat_client.chat.completions.create(**kwargs)
+        except openai.APITimeoutError:
+            self.count('timeouts')
+            raise
+        with self.lock:
+            self.latencies.append(time.perf_counter() - t0)
+        return response
+
+    def hedged_call(self, kwargs):
+        primary = self.executor.submit(self.timed_call, kwargs)
+        delay = self.hedge_delay()
+        if delay is None:
+            return primary.result()
+
+        done, _ = wait([primary], timeout=delay)
+        if done or not self.take_hedge_budget():
+            return primary.result()
+
+        hedge = self.executor.submit(self.timed_call, kwargs)
+        pending = {primary, hedge}
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    if future is hedge:
+                        self.count('hedges_won')
+                    return future.result()
+        # Both failed: report the primary's error
+        return primary.result()
+
+    def create_chat(self, **kwargs):
+        """chat.completions.create with deadline, jittered exponential backoff and hedging."""
+        self.count('requests')
+        for attempt in range(self.retries + 1):
+            try:
+                if self.hedge:
+                    return self.hedged_call(kwargs)
+                return self.timed_call(kwargs)
+            except Exception as e:
+                if attempt == self.retries or not is_retryable_error(e):
+                    self.count('errors')
+                    raise
+                # Full jitter: acak antara 0 dan backoff eksponensial
+                delay = random.uniform(0, min(RETRY_BACKOFF_MAX, RETRY_BACKOFF_BASE * 2 ** attempt))
+                self.count('retries')
+                print(f"  Request gagal ({type(e).__name__}), coba lagi dalam {delay:.1f}s "
+                      f"({attempt + 1}/{self.retries})...")
+                time.sleep(delay)
+
+    def print_stats(self):
+        stats = self.stats
+        if not stats['requests']:
+            return
+        print(f"  Request translasi: {stats['requests']} (attempt: {stats['attempts']}, retry: {stats['retries']}, "
+              f"timeout: {stats['timeouts']}, gagal: {stats['errors']})")
+        if self.hedge:
+            p = self.hedge_delay()
+            p_text = f"{p:.1f}s" if p is not None else "-"
+            print(f"  Hedge: {stats['hedges_fired']} dikirim, {stats['hedges_won']} menang (p95 latency: {p_text})")
+
+    def close(self):
+        """Shut down the hedge thread pool; losing duplicates still in flight are abandoned."""
+        if self.executor is not None:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+
 def get_api_key_from_config(config_file):
     """Membaca API key dari file config.ini"""
     if not os.path.exists(config_file):
@@ -121,6 +313,18 @@ def get_model_from_config(config_file):
     except (KeyError, configparser.NoSectionError):
         return None
 
+def get_prompts_from_config(config_file):
+    """Membaca prompt translasi per bahasa dari section [PROMPTS] di config.ini"""
+    if not os.path.exists(config_file):
+        return {}
+
+    config = configparser.ConfigParser()
+    config.read(config_file, encoding="utf-8")
+
+    if not config.has_section('PROMPTS'):
+        return {}
+    return {lang: prompt.strip() for lang, prompt in config['PROMPTS'].items()}
+
 def get_mime_type(filename):
     """Menentukan MIME type berdasarkan ekstensi file"""
     ext = os.path.splitext(filename)[1].lower()
@@ -135,22 +339,394 @@ def get_mime_type(filename):
     }
     return mime_types.get(ext, 'audio/wav')
 
-def transcribe_local(audio_path, model_name="jctv-tech/kotoba-whisper-v21-ct2", device="cuda", compute_type="int8"):
+# Opsi decode default untuk faster-whisper
+TRANSCRIBE_OPTIONS = {
+    'language': "ja",
+    'vad_filter': False,
+    'condition_on_previous_text': False,
+    'beam_size': 5,
+}
+
+# Repetition-loop guard: beberapa segmen berturut-turut yang n-gram karakternya hampir sama,
+# atau satu segmen dengan compression ratio di atas ambang, dianggap loop
+LOOP_NGRAM_SIZE = 4
+LOOP_NGRAM_REPEATS = 4
+LOOP_NGRAM_OVERLAP = 0.5
+LOOP_COMPRESSION_RATIO = 2.4
+# Panjang minimal window (detik) yang di-decode ulang saat loop terdeteksi
+LOOP_REDECODE_SECONDS = 30
+# Opsi tambahan untuk decode ulang window yang loop
+LOOP_REDECODE_OPTIONS = {
+    'temperature': [0.2, 0.4, 0.6, 0.8, 1.0],
+    'repetition_penalty': 1.3,
+    'no_repeat_ngram_size': 3,
+    'compression_ratio_threshold': 2.0,
+}
+
+def text_compression_ratio(text):
+    """zlib compression ratio of the UTF-8 text, as used by Whisper's fallback check."""
+    data = text.encode('utf-8')
+    if not data:
+        return 0.0
+    return len(data) / len(zlib.compress(data))
+
+def char_ngrams(text, n=LOOP_NGRAM_SIZE):
+    """Set of character n-grams (Japanese has no word boundaries); short texts count as one gram."""
+    text = re.sub(r'[\s、。，,．.！!？?…~〜ー-]+', '', text)
+    if len(text) <= n:
+        return {text} if text else set()
+    return {text[i:i + n] for i in range(len(text) - n + 1)}
+
+def ngram_overlap(a, b, n=LOOP_NGRAM_SIZE):
+    """Jaccard overlap of the character n-grams of two texts."""
+    grams_a, grams_b = char_ngrams(a, n), char_ngrams(b, n)
+    if not grams_a or not grams_b:
+        return 0.0
+    return len(grams_a & grams_b) / len(grams_a | grams_b)
+
+class RepetitionLoopDetector:
+    """Online detector for repetition loops over streaming segments.
+
+    Fires when a single segment's compression ratio spikes, or when each of
+    the last `repeats` segments shares most of its character n-grams with
+    the one before it (the model repeating the same phrase segment after
+    segment).
+    """
+
+    def __init__(self, ngram_size=LOOP_NGRAM_SIZE, repeats=LOOP_NGRAM_REPEATS,
+                 overlap=LOOP_NGRAM_OVERLAP, compression_ratio=LOOP_COMPRESSION_RATIO):
+        self.ngram_size = ngram_size
+        self.repeats = repeats
+        self.overlap = overlap
+        self.compression_ratio = compression_ratio
+        self.recent = deque(maxlen=repeats)
+
+    def push(self, segment):
+        """Add a segment; return the looping segments if a loop is detected, else None."""
+        if text_compression_ratio(segment['text']) > self.compression_ratio:
+            self.recent.clear()
+            return [segment]
+
+        self.recent.append(segment)
+        if len(self.recent) < self.repeats:
+            return None
+
+        loop = list(self.recent)
+        for prev, seg in zip(loop, loop[1:]):
+            if ngram_overlap(prev['text'], seg['text'], self.ngram_size) < self.overlap:
+                return None
+        self.recent.clear()
+        return loop
+
+def drop_repetitions(segments):
+    """Remove segments that still loop after re-decoding (keeps the first occurrence)."""
+    detector = RepetitionLoopDetector()
+    if not any(detector.push(seg) for seg in segments):
+        return segments
+
+    cleaned = []
+    for seg in segments:
+        if text_compression_ratio(seg['text']) > LOOP_COMPRESSION_RATIO:
+            continue
+        if cleaned and ngram_overlap(seg['text'], cleaned[-1]['text']) >= LOOP_NGRAM_OVERLAP:
+            continue
+        cleaned.append(seg)
+    return cleaned
+
+# Celah audio di antara region yang dikenali fingerprint yang lebih pendek dari ini tidak di-decode
+MIN_DECODE_SPAN_SECONDS = 1.0
+
+def find_known_regions(fingerprint_db, audio_path, langs):
+    """Regions matched against the fingerprint index (see fingerprint.py), or [] without an index."""
+    if not fingerprint_db:
+        return []
+    from fingerprint import known_regions
+    return known_regions(fingerprint_db, audio_path, langs)
+
+def decode_spans(duration, skip_regions):
+    """(start, end) spans of the audio not covered by `skip_regions`."""
+    spans = []
+    position = 0.0
+    for region in sorted(skip_regions, key=lambda r: r['start']):
+        if region['start'] - position >= MIN_DECODE_SPAN_SECONDS:
+            spans.append((position, region['start']))
+        position = max(position, region['end'])
+    if duration - position >= MIN_DECODE_SPAN_SECONDS:
+        spans.append((position, duration))
+    return spans
+
+def clip_timestamps_from(spans, offset=0.0):
+    """faster-whisper clip_timestamps (flat start,end list) for the spans after `offset`."""
+    clips = []
+    for start, end in spans:
+        if end > offset:
+            clips.extend([max(start, offset), end])
+    return clips
+
+def merge_known_cues(segments, skip_regions, lang):
+    """Insert the stored cues of skipped regions into the decoded/translated segments."""
+    if not skip_regions:
+        return segments
+    merged = list(segments)
+    for region in skip_regions:
+        merged.extend(region['cues'][lang])
+    return sorted(merged, key=lambda seg: seg['start'])
+
+def decode_window(model, audio, start, end, options):
+    """Decode audio[start:end] (seconds) and return segments with absolute timestamps.
+
+    Only the slice is handed to faster-whisper, which computes mel features
+    for its whole input regardless of clip_timestamps.
+    """
+    first = int(start * SAMPLE_RATE)
+    offset = first / SAMPLE_RATE
+    segments_iter, _ = model.transcribe(audio[first:int(end * SAMPLE_RATE)], **options)
+    return [{'start': seg.start + offset, 'end': seg.end + offset, 'text': seg.text.strip()}
+            for seg in segments_iter]
+
+def transcribe_with_loop_guard(model, audio_path, skip_regions=None):
+    """Decode with online repetition-loop detection.
+
+    Segments are checked as they stream out of the decoder. When a loop is
+    detected decoding stops, only the looping window (at least
+    LOOP_REDECODE_SECONDS long) is re-decoded with LOOP_REDECODE_OPTIONS,
+    and normal decoding resumes after the window.
+    """
+    audio = decode_audio(audio_path, sampling_rate=SAMPLE_RATE)
+    duration = len(audio) / SAMPLE_RATE
+    spans = decode_spans(duration, skip_regions or [])
+
+    segments = []
+    loops = 0
+    dropped_segments = 0
+    looped_seconds = 0.0
+    offset = 0.0
+
+    while offset < duration:
+        clips = clip_timestamps_from(spans, offset)
+        if not clips:
+            break
+        # Lanjutkan dari offset dengan potongan audio saja, bukan seluruh file
+        first = int(offset * SAMPLE_RATE)
+        base = first / SAMPLE_RATE
+        segments_iter, info = model.transcribe(audio[first:], clip_timestamps=[t - base for t in clips],
+                                               **TRANSCRIBE_OPTIONS)
+        if offset == 0.0:
+            print(f"Detected language: {info.language} (probability: {info.language_probability:.2f})")
+
+        detector = RepetitionLoopDetector()
+        loop = None
+        for seg in segments_iter:
+            segment = {'start': seg.start + base, 'end': seg.end + base, 'text': seg.text.strip()}
+            segments.append(segment)
+            loop = detector.push(segment)
+            if loop:
+                break
+
+        if not loop:
+            break
+
+        # Stop decoding here and re-decode only the looping window
+        del segments[-len(loop):]
+        window_start = loop[0]['start']
+        window_end = min(duration, max(loop[-1]['end'], window_start + LOOP_REDECODE_SECONDS))
+        # Jangan decode ulang ke dalam region yang dilewati fingerprint
+        span_end = next((end for start, end in spans if start <= window_start < end), duration)
+        window_end = min(window_end, max(span_end, loop[-1]['end']))
+        print(f"  Loop terdeteksi di {format_time(window_start)} ({len(loop)} segmen: "
+              f"\"{loop[-1]['text'][:30]}\"), decode ulang sampai {format_time(window_end)}...")
+
+        redecoded = drop_repetitions(decode_window(model, audio, window_start, window_end,
+                                                   {**TRANSCRIBE_OPTIONS, **LOOP_REDECODE_OPTIONS}))
+        segments.extend(redecoded)
+
+        loops += 1
+        dropped_segments += len(loop)
+        looped_seconds += loop[-1]['end'] - loop[0]['start']
+        offset = window_end
+
+    if loops:
+        print(f"Loop guard: {loops} loop, {dropped_segments} segmen berulang dibuang "
+              f"({looped_seconds:.1f} detik audio yang loop di-decode ulang)")
+    else:
+        print("Loop guard: tidak ada loop terdeteksi")
+    return segments
+
+# Adaptive decoding: pass 1 greedy, lalu hanya segmen yang kurang meyakinkan di-decode ulang dengan beam search
+ADAPTIVE_FIRST_PASS_OPTIONS = {
+    'beam_size': 1,
+    'temperature': 0.0,
+}
+ADAPTIVE_LOGPROB_THRESHOLD = -0.5
+ADAPTIVE_NO_SPEECH_THRESHOLD = 0.5
+ADAPTIVE_COMPRESSION_RATIO = 2.0
+# Segmen yang ditandai dan berjarak kurang dari ini digabung jadi satu window decode ulang
+ADAPTIVE_MERGE_GAP_SECONDS = 1.0
+# Konteks audio tambahan di kiri/kanan setiap window saat decode ulang
+ADAPTIVE_PAD_SECONDS = 0.5
+
+def needs_redecode(seg):
+    """Whether a greedy segment's confidence is low enough to be re-decoded with beam search."""
+    return (seg.avg_logprob < ADAPTIVE_LOGPROB_THRESHOLD
+            or seg.no_speech_prob > ADAPTIVE_NO_SPEECH_THRESHOLD
+            or seg.compression_ratio > ADAPTIVE_COMPRESSION_RATIO)
+
+def redecode_windows(flagged, spans):
+    """Merge flagged (start, end) segments that are close together into windows inside `spans`."""
+    merged = []
+    for start, end in sorted(flagged):
+        if merged and start - merged[-1][1] <= ADAPTIVE_MERGE_GAP_SECONDS:
+            merged[-1][1] = max(merged[-1][1], end)
+        else:
+            merged.append([start, end])
+
+    # Timestamp segmen bisa melewati batas span (mis. ke region yang dilewati fingerprint)
+    windows = []
+    for start, end in merged:
+        for span_start, span_end in spans:
+            clipped = [max(start, span_start), min(end, span_end)]
+            if clipped[1] > clipped[0]:
+                windows.append(clipped)
+    return windows
+
+def transcribe_adaptive(model, audio, skip_regions=None):
+    """Two-pass decoding: greedy everywhere, beam search only where confidence is low.
+
+    Pass 1 decodes the whole audio (float32 @16kHz) greedily. Segments
+    whose avg_logprob, no_speech_prob or compression ratio cross the
+    ADAPTIVE_* thresholds are merged into windows, re-decoded with the
+    normal beam-search TRANSCRIBE_OPTIONS, and spliced back by timestamp.
+    Each window is padded for context only up to the neighbouring greedy
+    segments that are kept, and re-decoded segments are clamped to that
+    range, so the spliced output never overlaps.
+
+    Returns (segments, stats).
+    """
+    duration = len(audio) / SAMPLE_RATE
+    spans = decode_spans(duration, skip_regions or [])
+    clips = clip_timestamps_from(spans)
+    if not clips:
+        return [], {'segments': 0, 'redecoded_segments': 0, 'decoded_seconds': 0.0,
+                    'redecoded_seconds': 0.0, 'first_pass_seconds': 0.0, 'second_pass_seconds': 0.0}
+
+    t0 = time.perf_counter()
+    segments_iter, info = model.transcribe(
+        audio,
+        clip_timestamps=clips,
+        **{**TRANSCRIBE_OPTIONS, **ADAPTIVE_FIRST_PASS_OPTIONS}
+    )
+    print(f"Detected language: {info.language} (probability: {info.language_probability:.2f})")
+
+    segments = []
+    flagged = []
+    for seg in segments_iter:
+        segments.append({'start': seg.start, 'end': seg.end, 'text': seg.text.strip()})
+        if needs_redecode(seg):
+            flagged.append((seg.start, seg.end))
+    first_pass = time.perf_counter() - t0
+
+    windows = redecode_windows(flagged, spans)
+    second_pass = 0.0
+    if windows:
+        def midpoint(seg):
+            return (seg['start'] + seg['end']) / 2
+
+        # Isi window diganti hasil beam search; segmen greedy lain dipertahankan
+        kept = [seg for seg in segments
+                if not any(start <= midpoint(seg) <= end for start, end in windows)]
+
+        kept_midpoints = [midpoint(seg) for seg in kept]
+
+        # Padding konteks hanya sampai segmen greedy yang dipertahankan dan batas span,
+        # jadi hasil beam search tidak pernah tumpang tindih dengan teks yang sudah ada
+        bounds = []
+        for start, end in windows:
+            span_start, span_end = next((s0, s1) for s0, s1 in spans if s0 <= start < s1)
+            before = bisect.bisect_left(kept_midpoints, start)
+            after = bisect.bisect_right(kept_midpoints, end)
+            low = max(span_start, start - ADAPTIVE_PAD_SECONDS)
+            if before > 0:
+                low = max(low, kept[before - 1]['end'])
+            high = min(span_end, end + ADAPTIVE_PAD_SECONDS)
+            if after < len(kept):
+                high = min(high, kept[after]['start'])
+            if high > low:
+                bounds.append((low, high))
+
+        t0 = time.perf_counter()
+        redecoded = []
+        for low, high in bounds:
+            # Segmen beam yang melewati batas dipotong, bukan dibuang: teksnya milik window ini
+            for seg in decode_window(model, audio, low, high, TRANSCRIBE_OPTIONS):
+                seg = {**seg, 'start': max(seg['start'], low), 'end': min(seg['end'], high)}
+                if seg['end'] > seg['start']:
+                    redecoded.append(seg)
+        second_pass = time.perf_counter() - t0
+
+        segments = sorted(kept + redecoded, key=lambda seg: seg['start'])
+
+    stats = {
+        'segments': len(segments),
+        'redecoded_segments': len(flagged),
+        'decoded_seconds': sum(end - start for start, end in spans),
+        'redecoded_seconds': sum(end - start for start, end in windows),
+        'first_pass_seconds': first_pass,
+        'second_pass_seconds': second_pass,
+    }
+    return segments, stats
+
+def print_adaptive_stats(stats):
+    share = stats['redecoded_seconds'] / stats['decoded_seconds'] if stats['decoded_seconds'] else 0.0
+    print(f"Adaptive decoding: {stats['redecoded_segments']} segmen ({stats['redecoded_seconds']:.1f} detik, "
+          f"{share:.1%} audio) di-decode ulang dengan beam search")
+    print(f"  Pass 1 (greedy): {stats['first_pass_seconds']:.1f}s, pass 2 (beam): {stats['second_pass_seconds']:.1f}s")
+
+def load_whisper_model(model_name="jctv-tech/kotoba-whisper-v21-ct2", device="cuda", compute_type="int8"):
+    """Load a faster-whisper model once so several files can reuse it."""
+    print(f"Loading model: {model_name} (device={device}, compute_type={compute_type})")
+    return WhisperModel(model_name, device=device, compute_type=compute_type)
+
+def transcribe_local(audio_path, model_name="jctv-tech/kotoba-whisper-v21-ct2", device="cuda", compute_type="int8",
+                     loop_guard=False, skip_regions=None, adaptive=False, asr_model=None):
     """Transcribe Japanese audio using local faster-whisper model.
 
+    With `loop_guard`, repetition loops are detected while decoding and
+    only the affected window is re-decoded (see transcribe_with_loop_guard).
+    With `adaptive`, decoding is greedy and only low-confidence segments
+    are re-decoded with beam search (see transcribe_adaptive).
+    `skip_regions` (from find_known_regions) are not decoded at all.
+    Pass an already loaded `asr_model` to reuse it across files.
+
     Returns list of segments with 'start', 'end', 'text' keys.
     """
-    print(f"Loading model: {model_name} (device={device}, compute_type={compute_type})")
-    model = WhisperModel(model_name, device=device, compute_type=compute_type)
+    model = asr_model or load_whisper_model(model_name, device, compute_type)
+
+    if loop_guard:
+        print("Transcribing with repetition-loop guard...")
+        segments = transcribe_with_loop_guard(model, audio_path, skip_regions)
+        print(f"Transcription complete! Total segments: {len(segments)}")
+        return segments
+
+    if adaptive:
+        print("Transcribing with adaptive decoding (greedy + beam search re-decode)...")
+        segments, stats = transcribe_adaptive(model, decode_audio(audio_path, sampling_rate=SAMPLE_RATE),
+                                              skip_regions)
+        print_adaptive_stats(stats)
+        print(f"Transcription complete! Total segments: {len(segments)}")
+        return segments
+
+    audio = audio_path
+    options = TRANSCRIBE_OPTIONS
+    if skip_regions:
+        audio = decode_audio(audio_path, sampling_rate=SAMPLE_RATE)
+        clips = clip_timestamps_from(decode_spans(len(audio) / SAMPLE_RATE, skip_regions))
+        if not clips:
+            print("Seluruh audio dikenali fingerprint, tidak ada yang perlu di-decode.")
+            return []
+        options = {**TRANSCRIBE_OPTIONS, 'clip_timestamps': clips}
 
     print("Transcribing with VAD filter...")
-    segments_iter, info = model.transcribe(
-        audio_path,
-        language="ja",
-        vad_filter=False,
-        condition_on_previous_text=False,
-        beam_size=5,
-    )
+    segments_iter, info = model.transcribe(audio, **options)
 
     print(f"Detected language: {info.language} (probability: {info.language_probability:.2f})")
 
@@ -166,12 +742,16 @@ def transcribe_local(audio_path, model_name="jctv-tech/kotoba-whisper-v21-ct2",
     return segments
 
 # NEW: Transcribe only method (no translation)
-def process_transcribe_only_method(input_file, whisper_model, device, compute_type):
+def process_transcribe_only_method(input_file, whisper_model, device, compute_type, loop_guard=False,
+                                   fingerprint_db=None, adaptive=False, asr_model=None):
     """Transcribe Japanese audio without translation using local model."""
     print("Menggunakan metode: Transcribe Only (Japanese)")
     print(f"Model: {whisper_model}")
 
-    segments = transcribe_local(input_file, whisper_model, device, compute_type)
+    regions = find_known_regions(fingerprint_db, input_file, ["ja"])
+    segments = transcribe_local(input_file, whisper_model, device, compute_type, loop_guard, regions, adaptive,
+                                asr_model)
+    segments = merge_known_cues(segments, regions, "ja")
 
     if not segments:
         print("Tidak ada segmen ditemukan.")
@@ -179,9 +759,371 @@ def process_transcribe_only_method(input_file, whisper_model, device, compute_ty
 
     return segments
 
+def build_batch_text(batch_segments, label="Dialog"):
+    """Combine segment texts into one request body with [label N] markers."""
+    batch_texts = []
+    for i, seg in enumerate(batch_segments):
+        # Remove null bytes and control characters that break JSON serialization
+        text = re.sub(r'[\x00-\x08\x0b\x0c\x0e-\x1f\x7f]', '', seg['text'])
+        batch_texts.append(f"[{label} {i+1}] {text}")
+    return "\n".join(batch_texts)
+
+CONTEXT_PROMPT_NOTE = (
+    "Baris di bagian \"Konteks\" hanya untuk referensi alur cerita. "
+    "Jangan terjemahkan atau tulis ulang baris konteks, terjemahkan hanya baris bertanda [Dialog X]."
+)
+
+def format_context(context):
+    """Context cues as plain lines, with the existing translation when there is one."""
+    lines = []
+    for cue in context:
+        text = re.sub(r'[\x00-\x08\x0b\x0c\x0e-\x1f\x7f]', '', cue['text'])
+        if cue.get('translation'):
+            lines.append(f"- {text} => {cue['translation']}")
+        else:
+            lines.append(f"- {text}")
+    return "\n".join(lines)
+
+def build_translation_messages(batch_segments, label="Dialog", context_before=None, context_after=None,
+                               target_lang="id"):
+    """Chat messages (system prompt + marked texts) for one translation batch.
+
+    Optional context cues (dicts with 'text' and, if already translated,
+    'translation') are shown around the batch for continuity but are not
+    part of the [label N] items to translate.
+    """
+    system_prompt = TRANSLATION_PROMPTS[target_lang]
+    user_content = build_batch_text(batch_segments, label)
+
+    if context_before or context_after:
+        system_prompt += "\n\n" + CONTEXT_PROMPT_NOTE
+        parts = []
+        if context_before:
+            parts.append("Konteks sebelumnya:\n" + format_context(context_before))
+        parts.append(user_content)
+        if context_after:
+            parts.append("Konteks sesudahnya:\n" + format_context(context_after))
+        user_content = "\n\n".join(parts)
+
+    return [
+        {"role": "system", "content": system_prompt.replace("[Dialog X]", f"[{label} X]")},
+        {"role": "user", "content": user_content}
+    ]
+
+def parse_batch_translation(result_text, label="Dialog"):
+    """Parse [label N] markers out of a GPT response into {N: text}."""
+    translated_dialogs = {}
+    current_dialog = None
+    current_text = []
+
+    for line in result_text.split('\n'):
+        if line.strip().startswith(f'[{label}'):
+            # Save previous dialog if exists
+            if current_dialog is not None:
+                translated_dialogs[current_dialog] = ' '.join(current_text).strip()
+            try:
+                current_dialog = int(line.split(']')[0].split()[-1])
+                # Extract text after [label X]
+                text_after = line.split(']', 1)[1].strip() if ']' in line else ''
+                current_text = [text_after] if text_after else []
+            except:
+                continue
+        elif current_dialog is not None and line.strip():
+            current_text.append(line.strip())
+
+    # Save last dialog
+    if current_dialog is not None:
+        translated_dialogs[current_dialog] = ' '.join(current_text).strip()
+
+    return translated_dialogs
+
+def apply_batch_translation(batch_segments, translated_dialogs, batch_start, label="Dialog"):
+    """Pair each segment with its translation, falling back to the original text."""
+    translated_segments = []
+    for i, seg in enumerate(batch_segments):
+        translated = translated_dialogs.get(i + 1, '')
+
+        # Fallback to original if translation failed
+        if not translated:
+            print(f"  Warning: {label} {batch_start + i + 1} gagal diterjemahkan, menggunakan text original")
+            translated = seg['text']
+
+        translated_segments.append({
+            'start': seg['start'],
+            'end': seg['end'],
+            'text': translated
+        })
+    return translated_segments
+
+def translate_batch(client, model, batch_segments, batch_start=0, label="Dialog",
+                    context_before=None, context_after=None, target_lang="id"):
+    """Translate one batch via chat completions.
+
+    On error the original segments are returned unchanged. With a
+    LocalTranslator the batch is translated offline (context is not used).
+    """
+    if isinstance(client, LocalTranslator):
+        return client.translate_segments(batch_segments, target_lang, label, batch_start)
+
+    try:
+        chat_completion = client.create_chat(
+            model=model,
+            messages=build_translation_messages(batch_segments, label, context_before, context_after,
+                                                target_lang),
+            temperature=0.6
+        )
+
+        result_text = chat_completion.choices[0].message.content.strip()
+        translated_dialogs = parse_batch_translation(result_text, label)
+        return apply_batch_translation(batch_segments, translated_dialogs, batch_start, label)
+
+    except Exception as e:
+        print(f"  Error saat menerjemahkan batch: {str(e)}")
+        # Add original segments on error
+        return list(batch_segments)
+
+def translate_segments(client, segments, model, batch_size=5, label="Dialog", target_lang="id"):
+    """Translate segments in batches via synchronous chat completions.
+
+    A LocalTranslator gets all segments at once and batches them by length.
+    """
+    if isinstance(client, LocalTranslator):
+        print(f"Menerjemahkan {len(segments)} segmen dengan model lokal ({target_lang})...")
+        return client.translate_segments(segments, target_lang, label)
+
+    translated_segments = []
+
+    for batch_start in range(0, len(segments), batch_size):
+        batch_end = min(batch_start + batch_size, len(segments))
+        batch_segments = segments[batch_start:batch_end]
+
+        print(f"Menerjemahkan batch {batch_start//batch_size + 1} (segmen {batch_start+1}-{batch_end}, {target_lang})...")
+        translated_segments.extend(translate_batch(client, model, batch_segments, batch_start, label,
+                                                   target_lang=target_lang))
+
+        # Delay between batches to avoid rate limits
+        if batch_end < len(segments):
+            time.sleep(1)
+
+    return translated_segments
+
+def build_multi_lang_messages(batch_segments, target_langs, label="Dialog"):
+    """Chat messages asking for every target language at once as one JSON object."""
+    rules = []
+    for lang in target_langs:
+        rules.append(f"[{lang}] {LANGUAGE_NAMES.get(lang, lang)}:\n{TRANSLATION_PROMPTS[lang]}")
+    example = json.dumps({lang: {"1": "..."} for lang in target_langs}, ensure_ascii=False)
+    system_prompt = MULTI_LANG_PROMPT.format(
+        languages=", ".join(f"{lang} ({LANGUAGE_NAMES.get(lang, lang)})" for lang in target_langs),
+        rules="\n\n".join(rules),
+        example=example,
+    )
+    return [
+        {"role": "system", "content": system_prompt.replace("[Dialog X]", f"[{label} X]")},
+        {"role": "user", "content": build_batch_text(batch_segments, label)}
+    ]
+
+def parse_multi_lang_translation(result_text, target_langs):
+    """Parse a {lang: {N: text}} JSON response into {lang: {N(int): text}}."""
+    try:
+        data = json.loads(result_text)
+    except json.JSONDecodeError:
+        return {lang: {} for lang in target_langs}
+
+    translated = {}
+    for lang in target_langs:
+        dialogs = data.get(lang) if isinstance(data, dict) else None
+        translated[lang] = {}
+        if not isinstance(dialogs, dict):
+            continue
+        for key, text in dialogs.items():
+            try:
+                translated[lang][int(key)] = str(text).strip()
+            except ValueError:
+                continue
+    return translated
+
+def translate_batch_multi_lang(client, model, batch_segments, target_langs, batch_start=0, label="Dialog"):
+    """Translate one batch into every target language with a single structured request.
+
+    Returns {lang: segments}; on error every language gets the original segments.
+    """
+    try:
+        chat_completion = client.create_chat(
+            model=model,
+            messages=build_multi_lang_messages(batch_segments, target_langs, label),
+            response_format={"type": "json_object"},
+            temperature=0.6
+        )
+
+        result_text = chat_completion.choices[0].message.content.strip()
+        translated = parse_multi_lang_translation(result_text, target_langs)
+        return {
+            lang: apply_batch_translation(batch_segments, translated[lang], batch_start, f"{label} [{lang}]")
+            for lang in target_langs
+        }
+
+    except Exception as e:
+        print(f"  Error saat menerjemahkan batch: {str(e)}")
+        return {lang: list(batch_segments) for lang in target_langs}
+
+def translate_segments_multi_lang(client, segments, model, target_langs, batch_size=5, label="Dialog",
+                                  combined=False):
+    """Translate one set of segments into several languages.
+
+    By default every language runs its own batch loop concurrently. With
+    `combined`, each batch is one structured request returning all
+    languages. Returns {lang: translated segments}.
+    """
+    if combined:
+        results = {lang: [] for lang in target_langs}
+        for batch_start in range(0, len(segments), batch_size):
+            batch_end = min(batch_start + batch_size, len(segments))
+            print(f"Menerjemahkan batch {batch_start//batch_size + 1} (segmen {batch_start+1}-{batch_end}, "
+                  f"{','.join(target_langs)})...")
+            translated = translate_batch_multi_lang(client, model, segments[batch_start:batch_end],
+                                                    target_langs, batch_start, label)
+            for lang in target_langs:
+                results[lang].extend(translated[lang])
+
+            # Delay between batches to avoid rate limits
+            if batch_end < len(segments):
+                time.sleep(1)
+        return results
+
+    with ThreadPoolExecutor(max_workers=len(target_langs)) as executor:
+        futures = {
+            lang: executor.submit(translate_segments, client, segments, model, batch_size, label, lang)
+            for lang in target_langs
+        }
+        return {lang: future.result() for lang, future in futures.items()}
+
+# Batch API: maksimal 50.000 request per job
+MAX_BATCH_REQUESTS = 50000
+BATCH_FINAL_STATUSES = ("completed", "failed", "expired", "cancelled")
+
+def build_batch_requests(jobs, model, batch_size=5, label="Subtitle", target_lang="id"):
+    """Build Batch API request lines for every translation batch of every job.
+
+    `jobs` is a list of segment lists (one per file). The custom_id
+    "<job>:<batch_start>" is deterministic, so the same inputs map onto the
+    results of a resumed batch job.
+    """
+    requests = []
+    for job_idx, segments in enumerate(jobs):
+        for batch_start in range(0, len(segments), batch_size):
+            batch_segments = segments[batch_start:batch_start + batch_size]
+            requests.append({
+                "custom_id": f"{job_idx}:{batch_start}",
+                "method": "POST",
+                "url": "/v1/chat/completions",
+                "body": {
+                    "model": model,
+                    "messages": build_translation_messages(batch_segments, label, target_lang=target_lang),
+                    "temperature": 0.6
+                }
+            })
+    return requests
+
+def submit_batch_job(client, requests):
+    """Upload the requests as JSONL and create a batch job."""
+    jsonl = "\n".join(json.dumps(request, ensure_ascii=False) for request in requests) + "\n"
+    input_file = client.files.create(
+        file=("translate_batch.jsonl", jsonl.encode("utf-8")),
+        purpose="batch"
+    )
+    return client.batches.create(
+        input_file_id=input_file.id,
+        endpoint="/v1/chat/completions",
+        completion_window="24h"
+    )
+
+def wait_for_batch(client, batch_id, poll_interval=60):
+    """Poll a batch job until it reaches a final status."""
+    while True:
+        batch = client.batches.retrieve(batch_id)
+        counts = batch.request_counts
+        if counts is not None:
+            print(f"  Batch {batch_id}: {batch.status} ({counts.completed}/{counts.total} selesai, {counts.failed} gagal)")
+        else:
+            print(f"  Batch {batch_id}: {batch.status}")
+        if batch.status in BATCH_FINAL_STATUSES:
+            return batch
+        time.sleep(poll_interval)
+
+def read_batch_results(client, batch):
+    """Download a finished batch and return {custom_id: response text}.
+
+    Expired or cancelled jobs still expose the requests that completed, so
+    the output file is read whenever it exists.
+    """
+    results = {}
+    if not batch.output_file_id:
+        return results
+
+    content = client.files.content(batch.output_file_id).text
+    for line in content.splitlines():
+        if not line.strip():
+            continue
+        item = json.loads(line)
+        response = item.get('response') or {}
+        if response.get('status_code') != 200:
+            print(f"  Warning: request {item.get('custom_id')} gagal: {item.get('error') or response.get('status_code')}")
+            continue
+        results[item['custom_id']] = response['body']['choices'][0]['message']['content'].strip()
+    return results
+
+def translate_segments_batch_mode(client, jobs, model, batch_size=5, label="Subtitle",
+                                  poll_interval=60, batch_ids=None, target_lang="id"):
+    """Translate several segment lists through one or more Batch API jobs.
+
+    Returns the translated segment lists in the same order as `jobs`.
+    Pass `batch_ids` to resume polling jobs submitted by an earlier run
+    instead of submitting new ones.
+    """
+    requests = build_batch_requests(jobs, model, batch_size, label, target_lang)
+    chunks = [requests[i:i + MAX_BATCH_REQUESTS] for i in range(0, len(requests), MAX_BATCH_REQUESTS)]
+    print(f"Total request translasi: {len(requests)} ({len(chunks)} batch job)")
+
+    if batch_ids:
+        if len(batch_ids) != len(chunks):
+            raise ValueError(f"--batch-id berisi {len(batch_ids)} id, tetapi input menghasilkan {len(chunks)} batch job")
+        print(f"Melanjutkan batch job: {', '.join(batch_ids)}")
+    else:
+        batch_ids = []
+        for chunk in chunks:
+            batch = submit_batch_job(client, chunk)
+            batch_ids.append(batch.id)
+        print(f"Batch job dikirim: {', '.join(batch_ids)}")
+        print(f"Jika proses terputus, lanjutkan dengan: --batch-id {','.join(batch_ids)}")
+
+    results = {}
+    for batch_id in batch_ids:
+        batch = wait_for_batch(client, batch_id, poll_interval)
+        if batch.status != "completed":
+            print(f"  Warning: batch {batch_id} berakhir dengan status '{batch.status}'")
+        results.update(read_batch_results(client, batch))
+
+    translated_jobs = []
+    for job_idx, segments in enumerate(jobs):
+        translated_segments = []
+        for batch_start in range(0, len(segments), batch_size):
+            batch_segments = segments[batch_start:batch_start + batch_size]
+            result_text = results.get(f"{job_idx}:{batch_start}")
+            if result_text is None:
+                print(f"  Error: hasil batch untuk {label} {batch_start+1}-{batch_start+len(batch_segments)} tidak ada, menggunakan text original")
+                translated_segments.extend(batch_segments)
+                continue
+            translated_dialogs = parse_batch_translation(result_text, label)
+            translated_segments.extend(
+                apply_batch_translation(batch_segments, translated_dialogs, batch_start, label))
+        translated_jobs.append(translated_segments)
+
+    return translated_jobs
+
 # NEW: Translate SRT file method
-def process_translate_srt_method(client, input_srt, model, batch_size=5):
-    """Method to translate existing Japanese SRT file to Indonesian"""
+def process_translate_srt_method(client, input_srt, model, batch_size=5, target_lang="id"):
+    """Method to translate existing Japanese SRT file to Indonesian (or another target language)"""
     print(f"Menggunakan metode: Translate SRT File")
     print(f"Model translasi: {model}")
     print(f"Batch size: {batch_size} subtitle per batch")
@@ -195,195 +1137,190 @@ def process_translate_srt_method(client, input_srt, model, batch_size=5):
         return []
     
     print(f"Total subtitle ditemukan: {len(segments)}")
-    
-    translated_segments = []
-    
-    # Process in batches
-    for batch_start in range(0, len(segments), batch_size):
-        batch_end = min(batch_start + batch_size, len(segments))
-        batch_segments = segments[batch_start:batch_end]
-        
-        print(f"\nMenerjemahkan batch {batch_start//batch_size + 1} (subtitle {batch_start+1}-{batch_end})...")
-        
-        # Combine texts with markers
-        batch_texts = []
-        for i, seg in enumerate(batch_segments):
-            text = seg['text']
-            # Remove null bytes and control characters that break JSON serialization
-            text = re.sub(r'[\x00-\x08\x0b\x0c\x0e-\x1f\x7f]', '', text)
-            batch_texts.append(f"[Subtitle {i+1}] {text}")
-
-        combined_text = "\n".join(batch_texts)
-        
-        # Send to GPT for batch translation
-        try:
-            chat_completion = client.chat.completions.create(
-                model=model,
-                messages=[
-                    {
-                        "role": "system",
-                        "content": TRANSLATION_SYSTEM_PROMPT.replace("[Dialog X]", "[Subtitle X]")
-                    },
-                    {"role": "user", "content": combined_text}
-                ],
-                temperature=0.6
-            )
-            
-            result_text = chat_completion.choices[0].message.content.strip()
-            
-            # Parse translation results
-            translated_dialogs = {}
-            current_subtitle = None
-            current_text = []
-            
-            for line in result_text.split('\n'):
-                if line.strip().startswith('[Subtitle'):
-                    # Save previous subtitle if exists
-                    if current_subtitle is not None:
-                        translated_dialogs[current_subtitle] = ' '.join(current_text).strip()
-                    
-                    # Extract subtitle number
-                    try:
-                        subtitle_num = int(line.split(']')[0].split()[-1])
-                        current_subtitle = subtitle_num
-                        # Extract text after [Subtitle X]
-                        text_after = line.split(']', 1)[1].strip() if ']' in line else ''
-                        current_text = [text_after] if text_after else []
-                    except:
-                        continue
-                elif current_subtitle is not None and line.strip():
-                    current_text.append(line.strip())
-            
-            # Save last subtitle
-            if current_subtitle is not None:
-                translated_dialogs[current_subtitle] = ' '.join(current_text).strip()
-            
-            # Create translated segments
-            for i, seg in enumerate(batch_segments):
-                subtitle_num = i + 1
-                translated = translated_dialogs.get(subtitle_num, '')
-                
-                # Fallback to original if translation failed
-                if not translated:
-                    print(f"  Warning: Subtitle {batch_start + i + 1} gagal diterjemahkan, menggunakan text original")
-                    translated = seg['text']
-                
-                translated_segments.append({
-                    'start': seg['start'],
-                    'end': seg['end'],
-                    'text': translated
-                })
-            
-            # Delay between batches to avoid rate limits
-            if batch_end < len(segments):
-                time.sleep(1)
-                
-        except Exception as e:
-            print(f"  Error saat menerjemahkan batch: {str(e)}")
-            # Add original segments on error
-            for seg in batch_segments:
-                translated_segments.append(seg)
-    
-    return translated_segments
 
-def process_transcribe_method(client, input_file, model, whisper_model, batch_size, device, compute_type):
-    """Transcribe Japanese audio locally, then translate to Indonesian via GPT."""
-    print("Menggunakan metode: Transcribe (Local) + Translate (GPT)")
-    print(f"Model Whisper: {whisper_model}")
-    print(f"Model translasi: {model}")
+    return translate_segments(client, segments, model, batch_size, label="Subtitle", target_lang=target_lang)
 
-    # Step 1: Local transcription
-    segments = transcribe_local(input_file, whisper_model, device, compute_type)
+def normalize_cue_text(text):
+    """Cue text used for diffing: whitespace-insensitive."""
+    return re.sub(r'\s+', '', text)
 
+def align_previous_translation(prev_source, prev_translated):
+    """Previous translation of each previous source cue (None where missing).
+
+    Cues are paired by position when both files have the same number of
+    cues, otherwise by identical timing.
+    """
+    if len(prev_source) == len(prev_translated):
+        return [seg['text'] for seg in prev_translated]
+
+    by_timing = {(round(seg['start'], 3), round(seg['end'], 3)): seg['text'] for seg in prev_translated}
+    return [by_timing.get((round(seg['start'], 3), round(seg['end'], 3))) for seg in prev_source]
+
+def diff_cues(prev_source, segments):
+    """Index of the unchanged previous cue for every new cue, or None if edited/inserted.
+
+    Cues are aligned by their text with difflib, so cues that were only
+    re-timed or shifted by insertions/deletions still match.
+    """
+    matcher = difflib.SequenceMatcher(
+        None,
+        [normalize_cue_text(seg['text']) for seg in prev_source],
+        [normalize_cue_text(seg['text']) for seg in segments],
+        autojunk=False
+    )
+    mapping = [None] * len(segments)
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag == 'equal':
+            for k in range(i2 - i1):
+                mapping[j1 + k] = i1 + k
+    return mapping
+
+def process_translate_srt_incremental_method(client, input_srt, prev_source_srt, prev_translated_srt,
+                                             model, batch_size=5, context_cues=2, target_lang="id"):
+    """Retranslate only the cues that changed since a previous source/translation pair.
+
+    Unchanged cues keep their previous translation (with the new timing);
+    edited and inserted cues are sent in batches together with a few
+    surrounding cues as context, so API calls scale with the edit size.
+    """
+    print(f"Menggunakan metode: Translate SRT File (incremental)")
+    print(f"Model translasi: {model}")
+    print(f"Membaca file SRT: {input_srt}")
+    print(f"SRT sebelumnya: {prev_source_srt} -> {prev_translated_srt}")
+
+    segments = read_srt_file(input_srt)
     if not segments:
-        print("Tidak ada segmen ditemukan.")
+        print("Tidak ada subtitle yang ditemukan dalam file SRT.")
         return []
 
-    print(f"\nTotal segmen: {len(segments)}")
-    print("Memulai translasi ke bahasa Indonesia...")
+    prev_source = read_srt_file(prev_source_srt)
+    prev_text = align_previous_translation(prev_source, read_srt_file(prev_translated_srt))
+    mapping = diff_cues(prev_source, segments)
+    translations = [prev_text[i] if i is not None else None for i in mapping]
 
-    # Step 2: Translate in batches via GPT
-    translated_segments = []
+    changed = [i for i, text in enumerate(translations) if not text]
+    full_calls = (len(segments) + batch_size - 1) // batch_size
+    print(f"Total subtitle: {len(segments)}, berubah/baru: {len(changed)}, dipakai ulang: {len(segments) - len(changed)}")
 
-    for batch_start in range(0, len(segments), batch_size):
-        batch_end = min(batch_start + batch_size, len(segments))
-        batch_segments = segments[batch_start:batch_end]
+    # Group changed cues into contiguous runs of at most batch_size
+    runs = []
+    for i in changed:
+        if runs and i == runs[-1][-1] + 1 and len(runs[-1]) < batch_size:
+            runs[-1].append(i)
+        else:
+            runs.append([i])
 
-        print(f"Menerjemahkan batch {batch_start//batch_size + 1} (segmen {batch_start+1}-{batch_end})...")
+    def context(indices):
+        return [{'text': segments[i]['text'], 'translation': translations[i]} for i in indices]
 
-        batch_texts = []
-        for i, seg in enumerate(batch_segments):
-            text = re.sub(r'[\x00-\x08\x0b\x0c\x0e-\x1f\x7f]', '', seg['text'])
-            batch_texts.append(f"[Dialog {i+1}] {text}")
+    for n, run in enumerate(runs):
+        batch_segments = [segments[i] for i in run]
+        before = context(range(max(0, run[0] - context_cues), run[0]))
+        after = context(range(run[-1] + 1, min(len(segments), run[-1] + 1 + context_cues)))
 
-        combined_text = "\n".join(batch_texts)
+        print(f"Menerjemahkan batch {n + 1}/{len(runs)} (subtitle {run[0] + 1}-{run[-1] + 1})...")
+        translated = translate_batch(client, model, batch_segments, run[0], "Subtitle", before, after, target_lang)
+        for i, seg in zip(run, translated):
+            translations[i] = seg['text']
 
-        try:
-            chat_completion = client.chat.completions.create(
-                model=model,
-                messages=[
-                    {"role": "system", "content": TRANSLATION_SYSTEM_PROMPT},
-                    {"role": "user", "content": combined_text}
-                ],
-                temperature=0.6
-            )
+        # Delay between batches to avoid rate limits
+        if n < len(runs) - 1:
+            time.sleep(1)
 
-            result_text = chat_completion.choices[0].message.content.strip()
-
-            # Parse translation results
-            translated_dialogs = {}
-            current_dialog = None
-            current_text = []
-
-            for line in result_text.split('\n'):
-                if line.strip().startswith('[Dialog'):
-                    if current_dialog is not None:
-                        translated_dialogs[current_dialog] = ' '.join(current_text).strip()
-                    try:
-                        dialog_num = int(line.split(']')[0].split()[-1])
-                        current_dialog = dialog_num
-                        text_after = line.split(']', 1)[1].strip() if ']' in line else ''
-                        current_text = [text_after] if text_after else []
-                    except:
-                        continue
-                elif current_dialog is not None and line.strip():
-                    current_text.append(line.strip())
+    print(f"API calls: {len(runs)} (translasi penuh: {full_calls})")
 
-            if current_dialog is not None:
-                translated_dialogs[current_dialog] = ' '.join(current_text).strip()
+    return [
+        {'start': seg['start'], 'end': seg['end'], 'text': text}
+        for seg, text in zip(segments, translations)
+    ]
 
-            for i, seg in enumerate(batch_segments):
-                dialog_num = i + 1
-                translated = translated_dialogs.get(dialog_num, '')
-                if not translated:
-                    print(f"  Warning: Dialog {batch_start + i + 1} gagal diterjemahkan, menggunakan text original")
-                    translated = seg['text']
+def process_translate_srt_batch_method(client, input_srts, model, batch_size=5, poll_interval=60, batch_ids=None,
+                                       target_lang="id"):
+    """Translate one or many Japanese SRT files through the Batch API.
 
-                translated_segments.append({
-                    'start': seg['start'],
-                    'end': seg['end'],
-                    'text': translated
-                })
+    Returns one translated segment list per input file (empty when the
+    file has no subtitles).
+    """
+    print(f"Menggunakan metode: Translate SRT File (Batch API)")
+    print(f"Model translasi: {model}")
+    print(f"Batch size: {batch_size} subtitle per batch")
 
-            if batch_end < len(segments):
-                time.sleep(1)
+    jobs = []
+    for input_srt in input_srts:
+        segments = read_srt_file(input_srt)
+        print(f"  {input_srt}: {len(segments)} subtitle")
+        jobs.append(segments)
 
-        except Exception as e:
-            print(f"  Error saat menerjemahkan batch: {str(e)}")
-            for seg in batch_segments:
-                translated_segments.append(seg)
+    if not any(jobs):
+        print("Tidak ada subtitle yang ditemukan dalam file SRT.")
+        return [[] for _ in jobs]
 
-    return translated_segments
+    return translate_segments_batch_mode(client, jobs, model, batch_size, "Subtitle", poll_interval, batch_ids,
+                                         target_lang)
+
+def process_transcribe_method(client, input_file, model, whisper_model, batch_size, device, compute_type,
+                              loop_guard=False, target_lang="id", fingerprint_db=None, adaptive=False,
+                              asr_model=None):
+    """Transcribe Japanese audio locally, then translate to Indonesian (or another target language) via GPT."""
+    print("Menggunakan metode: Transcribe (Local) + Translate (GPT)")
+    print(f"Model Whisper: {whisper_model}")
+    print(f"Model translasi: {model}")
+
+    # Step 1: Local transcription (region yang dikenali fingerprint dilewati)
+    regions = find_known_regions(fingerprint_db, input_file, [target_lang])
+    segments = transcribe_local(input_file, whisper_model, device, compute_type, loop_guard, regions, adaptive,
+                                asr_model)
 
+    if not segments and not regions:
+        print("Tidak ada segmen ditemukan.")
+        return []
+
+    print(f"\nTotal segmen: {len(segments)}")
+    print(f"Memulai translasi ke bahasa {LANGUAGE_NAMES.get(target_lang, target_lang)}...")
+
+    # Step 2: Translate in batches via GPT
+    translated = translate_segments(client, segments, model, batch_size, label="Dialog", target_lang=target_lang)
+    return merge_known_cues(translated, regions, target_lang)
+
+def process_multi_lang_method(client, input_file, method, model, whisper_model, batch_size, device, compute_type,
+                              target_langs, loop_guard=False, combined=False, fingerprint_db=None,
+                              adaptive=False):
+    """Transcribe (or read the SRT) once, then translate into every target language.
+
+    Returns {lang: translated segments}; ASR runs a single time regardless
+    of the number of languages.
+    """
+    regions = []
+    if method == "translate-srt":
+        print(f"Membaca file SRT: {input_file}")
+        segments = read_srt_file(input_file)
+        label = "Subtitle"
+    else:
+        print(f"Model Whisper: {whisper_model}")
+        regions = find_known_regions(fingerprint_db, input_file, target_langs)
+        segments = transcribe_local(input_file, whisper_model, device, compute_type, loop_guard, regions, adaptive)
+        label = "Dialog"
+
+    if not segments and not regions:
+        print("Tidak ada segmen ditemukan.")
+        return {}
+
+    print(f"\nTotal segmen: {len(segments)}")
+    print(f"Memulai translasi ke: {', '.join(LANGUAGE_NAMES.get(lang, lang) for lang in target_langs)}"
+          f"{' (satu request per batch)' if combined else ''}...")
+    results = translate_segments_multi_lang(client, segments, model, target_langs, batch_size, label, combined)
+    return {lang: merge_known_cues(translated, regions, lang) for lang, translated in results.items()}
 
 def main():
     parser = argparse.ArgumentParser(description="Transcribe/Translate Japanese audio/SRT to Indonesian")
     
     # Input/Output arguments
-    parser.add_argument("--input", default="audio.wav", 
-                        help="File audio input atau file SRT (default: audio.wav)")
+    parser.add_argument("--input", nargs="+", default=["audio.wav"],
+                        help="File audio input atau file SRT (default: audio.wav). "
+                             "Beberapa file SRT hanya didukung dengan --translate-mode batch")
     parser.add_argument("--output", default="output.srt", 
-                        help="File SRT output (default: output.srt)")
+                        help="File SRT output (default: output.srt). Jika input lebih dari satu, "
+                             "output ditulis sebagai <nama input>_id.srt di samping file input")
     
     # API Configuration
     parser.add_argument("--api_key", required=False, 
@@ -393,6 +1330,31 @@ def main():
     parser.add_argument("--model", default="gpt-3.5-turbo", 
                         help="Model OpenAI untuk translasi (default: gpt-3.5-turbo). "
                              "Opsi: gpt-3.5-turbo, gpt-4, gpt-4-turbo-preview, gpt-4o, gpt-4o-mini")
+    parser.add_argument("--base-url", default=None,
+                        help="Base URL API OpenAI (opsional, misalnya server lokal/mock)")
+    parser.add_argument("--request-timeout", type=float, default=REQUEST_TIMEOUT,
+                        help=f"Deadline per request translasi dalam detik (default: {REQUEST_TIMEOUT})")
+    parser.add_argument("--max-retries", type=int, default=REQUEST_RETRIES,
+                        help=f"Jumlah retry per request dengan exponential backoff + jitter (default: {REQUEST_RETRIES})")
+    parser.add_argument("--hedge", action="store_true",
+                        help="Kirim request duplikat jika batch belum kembali setelah p95 latency; jawaban pertama dipakai")
+    parser.add_argument("--hedge-budget", type=float, default=HEDGE_BUDGET,
+                        help=f"Maksimal request hedge sebagai fraksi dari jumlah request (default: {HEDGE_BUDGET})")
+    parser.add_argument("--translator", default="openai", choices=["openai", "local"],
+                        help="'openai' - translasi via GPT (default)\n"
+                             "'local' - model seq2seq CTranslate2 lokal (NLLB/M2M100/Marian), offline dan deterministik")
+    parser.add_argument("--mt-model", default=None,
+                        help="Path model CTranslate2 + tokenizer untuk --translator local")
+    parser.add_argument("--mt-device", default="cpu", choices=["cpu", "cuda"],
+                        help="Device untuk model translasi lokal (default: cpu)")
+    parser.add_argument("--mt-compute-type", default="int8", choices=["int8", "float16", "float32"],
+                        help="Compute type model translasi lokal (default: int8)")
+    parser.add_argument("--mt-beam-size", type=int, default=MT_BEAM_SIZE,
+                        help=f"Beam size model translasi lokal (default: {MT_BEAM_SIZE})")
+    parser.add_argument("--mt-batch-tokens", type=int, default=MT_MAX_BATCH_TOKENS,
+                        help=f"Maksimal token per batch; segmen dikelompokkan per panjang (default: {MT_MAX_BATCH_TOKENS})")
+    parser.add_argument("--mt-target-lang", default=None,
+                        help="Bahasa target tetap model Marian (default: dibaca dari tokenizer_config.json)")
     parser.add_argument("--whisper-model", default="jctv-tech/kotoba-whisper-v21-ct2",
                         help="Model Whisper lokal (default: jctv-tech/kotoba-whisper-v21-ct2)")
     
@@ -407,6 +1369,29 @@ def main():
     parser.add_argument("--batch-size", type=int, default=5,
                         help="Jumlah dialog/subtitle per batch untuk translasi (default: 5)")
 
+    parser.add_argument("--target-langs", default="id",
+                        help="Bahasa target dipisah koma, mis. id,en,ms (default: id). Audio hanya ditranskripsi "
+                             "sekali; output ditulis sebagai <output>_<bahasa>.srt jika lebih dari satu bahasa")
+    parser.add_argument("--multi-lang-request", action="store_true",
+                        help="Minta semua bahasa target dalam satu request JSON per batch "
+                             "(alih-alih satu request per bahasa secara paralel)")
+
+    parser.add_argument("--translate-mode", default="sync", choices=["sync", "batch"],
+                        help="'sync' - chat completions langsung (default)\n"
+                             "'batch' - kirim semua request sebagai Batch API job (lebih murah, "
+                             "hasil dalam hitungan jam; hanya untuk translate-srt)")
+    parser.add_argument("--batch-poll", type=float, default=60,
+                        help="Interval polling status Batch API dalam detik (default: 60)")
+    parser.add_argument("--batch-id", default=None,
+                        help="Lanjutkan batch job yang sudah dikirim (id dipisah koma) alih-alih mengirim ulang")
+
+    parser.add_argument("--prev-source", default=None,
+                        help="SRT Jepang versi sebelumnya (translate-srt): hanya cue yang berubah diterjemahkan ulang")
+    parser.add_argument("--prev-translated", default=None,
+                        help="Hasil terjemahan dari --prev-source; terjemahan cue yang tidak berubah dipakai ulang")
+    parser.add_argument("--context-cues", type=int, default=2,
+                        help="Jumlah cue di sekitar perubahan yang dikirim sebagai konteks (default: 2)")
+
     parser.add_argument("--device", default="cuda", choices=["cuda", "cpu"],
                         help="Device untuk model Whisper (default: cuda)")
 
@@ -414,35 +1399,105 @@ def main():
                         choices=["float16", "int8", "float32"],
                         help="Compute type untuk model Whisper (default: int8)")
 
+    parser.add_argument("--loop-guard", action="store_true",
+                        help="Deteksi loop repetisi saat decode; hanya window yang loop di-decode ulang")
+
+    parser.add_argument("--adaptive", action="store_true",
+                        help="Decode greedy dulu, lalu hanya segmen dengan confidence rendah di-decode ulang "
+                             "dengan beam search (lebih cepat di CPU)")
+
+    parser.add_argument("--fingerprint-db", default=None,
+                        help="Indeks fingerprint (lihat fingerprint.py): opening/ending/jingle yang dikenali "
+                             "tidak di-decode/diterjemahkan, diganti cue yang tersimpan")
+
     args = parser.parse_args()
     
     # Validate input based on method
     method = args.method
-    input_file = args.input
+    input_files = args.input
     output_srt = args.output
-    
-    # Check if input is SRT for translate-srt method
-    if method == "translate-srt":
-        if not input_file.lower().endswith('.srt'):
-            print(f"Error: Metode 'translate-srt' memerlukan file SRT sebagai input!")
-            print(f"File yang diberikan: {input_file}")
+    translate_mode = args.translate_mode
+
+    # Prompt tambahan/pengganti per bahasa dari config.ini
+    TRANSLATION_PROMPTS.update(get_prompts_from_config(args.config))
+    target_langs = [lang.strip() for lang in args.target_langs.split(',') if lang.strip()]
+    unknown_langs = [lang for lang in target_langs if lang not in TRANSLATION_PROMPTS]
+    if not target_langs or unknown_langs:
+        print(f"Error: Bahasa target tidak dikenal: {', '.join(unknown_langs) or '(kosong)'}")
+        print(f"Bahasa yang tersedia: {', '.join(TRANSLATION_PROMPTS)} (tambahkan prompt di section [PROMPTS] {args.config})")
+        return
+    target_lang = target_langs[0]
+    multi_lang = len(target_langs) > 1
+
+    if multi_lang and (method == "transcribe-only" or translate_mode == "batch"
+                       or args.prev_source or args.prev_translated):
+        print(f"Error: Beberapa bahasa target hanya didukung untuk metode 'transcribe' dan 'translate-srt' "
+              f"dengan --translate-mode sync.")
+        return
+
+    if translate_mode == "batch" and method != "translate-srt":
+        print(f"Error: --translate-mode batch hanya didukung untuk metode 'translate-srt'.")
+        return
+
+    incremental = bool(args.prev_source or args.prev_translated)
+    if incremental:
+        if not (args.prev_source and args.prev_translated):
+            print(f"Error: --prev-source dan --prev-translated harus diberikan bersama.")
             return
-    else:
-        # For audio methods, check if it's an audio file
-        if input_file.lower().endswith('.srt'):
-            print(f"Warning: File input adalah SRT, tetapi metode '{method}' memerlukan file audio.")
-            print("Gunakan --method translate-srt untuk menerjemahkan file SRT.")
+        if method != "translate-srt" or translate_mode != "sync":
+            print(f"Error: Translasi incremental hanya didukung untuk metode 'translate-srt' dengan --translate-mode sync.")
             return
-    
-    # Check if file exists
-    if not os.path.exists(input_file):
-        print(f"Error: File {input_file} tidak ditemukan!")
+        for prev_file in (args.prev_source, args.prev_translated):
+            if not os.path.exists(prev_file):
+                print(f"Error: File {prev_file} tidak ditemukan!")
+                return
+
+    if args.adaptive and args.loop_guard:
+        print(f"Error: --adaptive dan --loop-guard tidak bisa dipakai bersamaan.")
+        return
+
+    if args.fingerprint_db and not os.path.exists(args.fingerprint_db):
+        print(f"Error: Indeks fingerprint {args.fingerprint_db} tidak ditemukan! Buat dengan: python fingerprint.py add ...")
+        return
+
+    if len(input_files) > 1 and translate_mode != "batch":
+        print(f"Error: Beberapa file input hanya didukung dengan --method translate-srt --translate-mode batch.")
         return
     
+    for input_file in input_files:
+        # Check if input is SRT for translate-srt method
+        if method == "translate-srt":
+            if not input_file.lower().endswith('.srt'):
+                print(f"Error: Metode 'translate-srt' memerlukan file SRT sebagai input!")
+                print(f"File yang diberikan: {input_file}")
+                return
+        else:
+            # For audio methods, check if it's an audio file
+            if input_file.lower().endswith('.srt'):
+                print(f"Warning: File input adalah SRT, tetapi metode '{method}' memerlukan file audio.")
+                print("Gunakan --method translate-srt untuk menerjemahkan file SRT.")
+                return
+        
+        # Check if file exists
+        if not os.path.exists(input_file):
+            print(f"Error: File {input_file} tidak ditemukan!")
+            return
+    input_file = input_files[0]
+    
     # Get API key (only needed for methods that use GPT translation)
-    needs_api = method in ("transcribe", "translate-srt")
+    needs_translation = method in ("transcribe", "translate-srt")
+    local_translator = args.translator == "local"
+    needs_api = needs_translation and not local_translator
     api_key = None
 
+    if needs_translation and local_translator:
+        if not args.mt_model:
+            print(f"Error: --translator local memerlukan --mt-model (path model CTranslate2).")
+            return
+        if translate_mode == "batch" or args.multi_lang_request:
+            print(f"Error: --translator local tidak mendukung --translate-mode batch atau --multi-lang-request.")
+            return
+
     if needs_api:
         api_key = args.api_key
         if not api_key:
@@ -458,7 +1513,9 @@ def main():
     
     # Get model preference
     model = args.model
-    if model == "gpt-3.5-turbo":  # If still default
+    if local_translator:
+        model = args.mt_model
+    elif model == "gpt-3.5-turbo":  # If still default
         config_model = get_model_from_config(args.config)
         if config_model:
             model = config_model
@@ -467,31 +1524,107 @@ def main():
     batch_size = args.batch_size
     device = args.device
     compute_type = args.compute_type
+    loop_guard = args.loop_guard
     
     # Initialize OpenAI client only if needed
     client = None
     if needs_api:
         try:
-            client = OpenAI(api_key=api_key)
+            client = ChatRequester(
+                OpenAI(api_key=api_key, base_url=args.base_url),
+                timeout=args.request_timeout,
+                retries=args.max_retries,
+                hedge=args.hedge,
+                hedge_budget=args.hedge_budget
+            )
         except Exception as e:
             print(f"Error inisialisasi OpenAI client: {str(e)}")
             return
+    elif needs_translation:
+        try:
+            client = LocalTranslator(
+                args.mt_model,
+                device=args.mt_device,
+                compute_type=args.mt_compute_type,
+                beam_size=args.mt_beam_size,
+                max_batch_tokens=args.mt_batch_tokens,
+                model_target_lang=args.mt_target_lang
+            )
+        except Exception as e:
+            print(f"Error memuat model translasi lokal: {str(e)}")
+            return
+        try:
+            for lang in target_langs:
+                client.check_target_lang(lang)
+        except ValueError as e:
+            print(f"Error: {str(e)}")
+            return
     
     # Process based on selected method
     print(f"\n{'='*60}")
-    print(f"Memproses file: {input_file}")
+    print(f"Memproses file: {', '.join(input_files)}")
     
     try:
+        if method == "translate-srt" and translate_mode == "batch":
+            batch_ids = args.batch_id.split(',') if args.batch_id else None
+            results = process_translate_srt_batch_method(client, input_files, model, batch_size,
+                                                         args.batch_poll, batch_ids, target_lang)
+
+            if len(input_files) == 1:
+                output_files = [output_srt]
+            else:
+                output_files = [f"{os.path.splitext(f)[0]}_{target_lang}.srt" for f in input_files]
+
+            print(f"\n{'='*60}")
+            print(f"✓ Proses selesai!")
+            for segments, output_file in zip(results, output_files):
+                if not segments:
+                    print(f"  {output_file}: tidak ada segmen, dilewati")
+                    continue
+                with open(output_file, "w", encoding="utf-8") as srt_file:
+                    srt_file.write(create_srt(segments))
+                print(f"  {output_file}: {len(segments)} segmen")
+            return
+
+        if multi_lang:
+            print(f"Model translasi: {model}")
+            print(f"Bahasa target: {', '.join(target_langs)}")
+            results = process_multi_lang_method(client, input_file, method, model, whisper_model, batch_size,
+                                                device, compute_type, target_langs, loop_guard,
+                                                args.multi_lang_request, args.fingerprint_db, args.adaptive)
+            if not results:
+                print("\nTidak ada segmen yang berhasil diproses.")
+                return
+
+            output_base, output_ext = os.path.splitext(output_srt)
+            print(f"\n{'='*60}")
+            print(f"✓ Proses selesai!")
+            for lang, segments in results.items():
+                output_file = f"{output_base}_{lang}{output_ext or '.srt'}"
+                with open(output_file, "w", encoding="utf-8") as srt_file:
+                    srt_file.write(create_srt(segments))
+                print(f"  {output_file}: {len(segments)} segmen")
+            client.print_stats()
+            return
+
         if method == "transcribe-only":
             print(f"Model Whisper: {whisper_model}")
             print(f"Device: {device} ({compute_type})")
 
-            segments = process_transcribe_only_method(input_file, whisper_model, device, compute_type)
+            segments = process_transcribe_only_method(input_file, whisper_model, device, compute_type, loop_guard,
+                                                      args.fingerprint_db, args.adaptive)
+
+        elif method == "translate-srt" and incremental:
+            print(f"Metode: Translate SRT (incremental)")
+            print(f"Model translasi: {model}")
+            segments = process_translate_srt_incremental_method(client, input_file, args.prev_source,
+                                                                args.prev_translated, model, batch_size,
+                                                                args.context_cues, target_lang)
 
         elif method == "translate-srt":
             print(f"Metode: Translate SRT")
             print(f"Model translasi: {model}")
-            segments = process_translate_srt_method(client, input_file, model, batch_size)
+            segments = process_translate_srt_method(client, input_file, model, batch_size, target_lang)
 
         elif method == "transcribe":
             print(f"Model Whisper: {whisper_model}")
@@ -502,7 +1635,9 @@ def main():
             file_size = os.path.getsize(input_file)
             print(f"Ukuran file: {file_size / 1024 / 1024:.1f} MB")
 
-            segments = process_transcribe_method(client, input_file, model, whisper_model, batch_size, device, compute_type)
+            segments = process_transcribe_method(client, input_file, model, whisper_model, batch_size, device,
+                                                 compute_type, loop_guard, target_lang, args.fingerprint_db,
+                                                 args.adaptive)
         
         # Check if we got segments
         if not segments:
@@ -520,6 +1655,8 @@ def main():
         print(f"✓ Proses selesai!")
         print(f"  Total segmen: {len(segments)}")
         print(f"  Output disimpan ke: {output_srt}")
+        if client is not None:
+            client.print_stats()
         
         # Show sample of result
         if segments:
@@ -544,6 +1681,9 @@ def main():
         
         import traceback
         traceback.print_exc()
+    finally:
+        if isinstance(client, ChatRequester):
+            client.close()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
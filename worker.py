@@ -0,0 +1,533 @@
+import os
+import sys
+import json
+import time
+import socket
+import shutil
+import sqlite3
+import argparse
+import threading
+import traceback
+
+from openai import OpenAI
+
+from local_mt import LocalTranslator
+from whisper import (
+    HEDGE_BUDGET,
+    REQUEST_RETRIES,
+    REQUEST_TIMEOUT,
+    ChatRequester,
+    create_srt,
+    get_api_key_from_config,
+    get_model_from_config,
+    load_whisper_model,
+    process_transcribe_method,
+    process_transcribe_only_method,
+)
+
+# Ekstensi audio yang diambil dari spool (sama dengan get_mime_type)
+AUDIO_EXTENSIONS = ('.wav', '.mp3', '.mp4', '.m4a', '.ogg', '.flac', '.webm')
+
+QUEUE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    name          TEXT PRIMARY KEY,
+    mtime         REAL NOT NULL,
+    status        TEXT NOT NULL DEFAULT 'pending',
+    worker        TEXT,
+    lease_expires REAL,
+    attempts      INTEGER NOT NULL DEFAULT 0,
+    enqueued_at   REAL NOT NULL,
+    started_at    REAL,
+    finished_at   REAL,
+    audio_seconds REAL,
+    error         TEXT
+);
+CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, enqueued_at);
+"""
+
+
+def default_worker_id():
+    """Worker id unik per proses: <hostname>-<pid>"""
+    return f"{socket.gethostname()}-{os.getpid()}"
+
+
+def connect_queue(db_path):
+    """Open the lease table.
+
+    The database lives next to the spool on the shared filesystem. Rollback
+    journal (not WAL) is used because WAL needs shared memory and does not
+    work across NFS clients; every write runs inside BEGIN IMMEDIATE so only
+    one worker at a time can claim or finish a job.
+    """
+    conn = sqlite3.connect(db_path, timeout=60, isolation_level=None)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode=DELETE")
+    conn.executescript(QUEUE_SCHEMA)
+    return conn
+
+
+def scan_spool(conn, spool_dir, settle_seconds=10):
+    """Register new audio files in the spool directory as pending jobs.
+
+    Files modified in the last `settle_seconds` are skipped so half-copied
+    uploads are not picked up. A file whose job is already 'done' or
+    'failed' but which reappears with a new mtime is queued again.
+    """
+    now = time.time()
+    added = 0
+    for name in sorted(os.listdir(spool_dir)):
+        path = os.path.join(spool_dir, name)
+        if not os.path.isfile(path) or not name.lower().endswith(AUDIO_EXTENSIONS):
+            continue
+        mtime = os.path.getmtime(path)
+        if now - mtime < settle_seconds:
+            continue
+
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute("SELECT status, mtime FROM jobs WHERE name = ?", (name,)).fetchone()
+            if row is None:
+                conn.execute(
+                    "INSERT INTO jobs (name, mtime, enqueued_at) VALUES (?, ?, ?)",
+                    (name, mtime, now),
+                )
+                added += 1
+            elif row['status'] in ('done', 'failed') and row['mtime'] != mtime:
+                conn.execute(
+                    "UPDATE jobs SET status = 'pending', mtime = ?, worker = NULL, lease_expires = NULL, "
+                    "attempts = 0, enqueued_at = ?, started_at = NULL, finished_at = NULL, "
+                    "audio_seconds = NULL, error = NULL WHERE name = ?",
+                    (mtime, now, name),
+                )
+                added += 1
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+    return added
+
+
+def claim_job(conn, worker_id, lease_seconds, max_retries):
+    """Claim the oldest pending job, or a running job whose lease expired.
+
+    Expired jobs that already used all their attempts (e.g. a file that
+    crashes every worker that touches it) are marked failed instead of
+    being handed out again. Returns the job row (after claiming) or None
+    when the queue is empty.
+    """
+    now = time.time()
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        conn.execute(
+            "UPDATE jobs SET status = 'failed', lease_expires = NULL, finished_at = ?, "
+            "error = 'lease kedaluwarsa (worker crash?)' "
+            "WHERE status = 'running' AND lease_expires < ? AND attempts >= ?",
+            (now, now, max_retries),
+        )
+        row = conn.execute(
+            "SELECT name FROM jobs "
+            "WHERE status = 'pending' OR (status = 'running' AND lease_expires < ?) "
+            "ORDER BY enqueued_at LIMIT 1",
+            (now,),
+        ).fetchone()
+        if row is None:
+            conn.execute("COMMIT")
+            return None
+        conn.execute(
+            "UPDATE jobs SET status = 'running', worker = ?, lease_expires = ?, "
+            "attempts = attempts + 1, started_at = ?, error = NULL WHERE name = ?",
+            (worker_id, now + lease_seconds, now, row['name']),
+        )
+        job = conn.execute("SELECT * FROM jobs WHERE name = ?", (row['name'],)).fetchone()
+        conn.execute("COMMIT")
+        return job
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+
+
+def renew_lease(conn, name, worker_id, lease_seconds):
+    """Extend our lease. Returns False if the job is no longer ours."""
+    cur = conn.execute(
+        "UPDATE jobs SET lease_expires = ? WHERE name = ? AND worker = ? AND status = 'running'",
+        (time.time() + lease_seconds, name, worker_id),
+    )
+    return cur.rowcount == 1
+
+
+class LeaseKeeper(threading.Thread):
+    """Background thread that renews a job lease while it is being processed."""
+
+    def __init__(self, db_path, name, worker_id, lease_seconds):
+        super().__init__(daemon=True)
+        self.db_path = db_path
+        self.name_ = name
+        self.worker_id = worker_id
+        self.lease_seconds = lease_seconds
+        self.stop_event = threading.Event()
+        self.lost = False
+
+    def run(self):
+        conn = connect_queue(self.db_path)
+        try:
+            while not self.stop_event.wait(self.lease_seconds / 3):
+                try:
+                    if not renew_lease(conn, self.name_, self.worker_id, self.lease_seconds):
+                        self.lost = True
+                        return
+                except sqlite3.OperationalError as e:
+                    # Database sedang dikunci worker lain — coba lagi di putaran berikutnya
+                    print(f"  Warning: gagal memperpanjang lease {self.name_}: {e}")
+        finally:
+            conn.close()
+
+    def stop(self):
+        self.stop_event.set()
+        self.join()
+
+
+def owns_job(conn, name, worker_id):
+    """True while `worker_id` still holds the running job."""
+    row = conn.execute(
+        "SELECT 1 FROM jobs WHERE name = ? AND worker = ? AND status = 'running'",
+        (name, worker_id),
+    ).fetchone()
+    return row is not None
+
+
+def finish_job(conn, job, worker_id, spool_dir, done_dir, srt_content, audio_seconds):
+    """Move the results to the done folder and mark the job done.
+
+    The SRT is written and the audio moved under temporary names before
+    the queue is locked, so slow file I/O on the shared filesystem never
+    holds the database lock; the transaction only re-checks ownership and
+    flips the status. A worker that lost its lease puts the audio back and
+    never overwrites the output of the worker that took the job over.
+    Returns False when the job was no longer ours.
+    """
+    name = job['name']
+    stem = os.path.splitext(name)[0]
+    if not owns_job(conn, name, worker_id):
+        return False
+
+    spool_path = os.path.join(spool_dir, name)
+    audio_path = os.path.join(done_dir, name)
+    srt_path = os.path.join(done_dir, f"{stem}.srt")
+    audio_tmp = f"{audio_path}.{worker_id}.tmp"
+    srt_tmp = f"{srt_path}.{worker_id}.tmp"
+    with open(srt_tmp, "w", encoding="utf-8") as f:
+        f.write(srt_content)
+    try:
+        shutil.move(spool_path, audio_tmp)
+    except Exception:
+        os.remove(srt_tmp)
+        raise
+
+    done = False
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            owned = owns_job(conn, name, worker_id)
+            if owned:
+                conn.execute(
+                    "UPDATE jobs SET status = 'done', lease_expires = NULL, finished_at = ?, "
+                    "audio_seconds = ? WHERE name = ?",
+                    (time.time(), audio_seconds, name),
+                )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        done = owned
+    finally:
+        if done:
+            os.replace(srt_tmp, srt_path)
+            os.replace(audio_tmp, audio_path)
+        else:
+            os.remove(srt_tmp)
+            shutil.move(audio_tmp, spool_path)
+    return done
+
+
+def fail_job(conn, job, worker_id, error, max_retries):
+    """Release a failed job back to the queue, or mark it failed for good."""
+    status = 'failed' if job['attempts'] >= max_retries else 'pending'
+    conn.execute(
+        "UPDATE jobs SET status = ?, lease_expires = NULL, finished_at = ?, error = ? "
+        "WHERE name = ? AND worker = ?",
+        (status, time.time(), error, job['name'], worker_id),
+    )
+    return status
+
+
+def process_job(job, args, client, model, asr_model):
+    """Run transcription (+ translation) for one claimed job; returns segments."""
+    input_file = os.path.join(args.spool, job['name'])
+    if args.method == "transcribe-only":
+        return process_transcribe_only_method(input_file, args.whisper_model, args.device,
+                                              args.compute_type, args.loop_guard, args.fingerprint_db, args.adaptive,
+                                              asr_model=asr_model)
+    return process_transcribe_method(client, input_file, model, args.whisper_model,
+                                     args.batch_size, args.device, args.compute_type, args.loop_guard,
+                                     fingerprint_db=args.fingerprint_db, adaptive=args.adaptive,
+                                     asr_model=asr_model)
+
+
+def run_worker(args):
+    """Main loop: scan spool, claim a job, process it, repeat."""
+    db_path = args.queue_db or os.path.join(args.spool, ".queue.sqlite")
+    os.makedirs(args.done, exist_ok=True)
+    conn = connect_queue(db_path)
+    worker_id = args.worker_id or default_worker_id()
+
+    client = None
+    model = args.model
+    if args.method == "transcribe" and args.translator == "local":
+        if not args.mt_model:
+            print(f"Error: --translator local memerlukan --mt-model (path model CTranslate2).")
+            return 1
+        model = args.mt_model
+        client = LocalTranslator(args.mt_model, device=args.mt_device, compute_type=args.mt_compute_type,
+                                 model_target_lang=args.mt_target_lang)
+        try:
+            client.check_target_lang("id")
+        except ValueError as e:
+            print(f"Error: {str(e)}")
+            return 1
+    elif args.method == "transcribe":
+        api_key = args.api_key or get_api_key_from_config(args.config)
+        if not api_key:
+            print(f"Error: API key diperlukan untuk metode '{args.method}'.")
+            print(f"Silakan tentukan API key melalui argument --api_key atau di file {args.config}")
+            return 1
+        if model == "gpt-3.5-turbo":
+            model = get_model_from_config(args.config) or model
+        client = ChatRequester(OpenAI(api_key=api_key), timeout=args.request_timeout,
+                               retries=args.max_retries_request, hedge=args.hedge, hedge_budget=args.hedge_budget)
+
+    # Model Whisper dimuat sekali dan dipakai untuk semua job
+    asr_model = load_whisper_model(args.whisper_model, args.device, args.compute_type)
+
+    print(f"Worker {worker_id} siap")
+    print(f"  Spool : {args.spool}")
+    print(f"  Done  : {args.done}")
+    print(f"  Queue : {db_path}")
+
+    try:
+        while True:
+            try:
+                scan_spool(conn, args.spool, args.settle)
+                job = claim_job(conn, worker_id, args.lease, args.max_retries)
+            except sqlite3.OperationalError as e:
+                # Database dikunci worker lain melebihi busy timeout — coba lagi di putaran berikutnya
+                print(f"  Warning: queue database sibuk: {e}")
+                time.sleep(args.poll)
+                continue
+
+            if job is None:
+                if args.once:
+                    print("Antrian kosong, worker berhenti.")
+                    return 0
+                time.sleep(args.poll)
+                continue
+
+            print(f"\n{'='*60}")
+            print(f"[{worker_id}] Memproses {job['name']} (percobaan {job['attempts']}/{args.max_retries})")
+
+            keeper = LeaseKeeper(db_path, job['name'], worker_id, args.lease)
+            keeper.start()
+            try:
+                # Audio tanpa ucapan menghasilkan SRT kosong dan tetap dianggap selesai (bukan error)
+                segments = process_job(job, args, client, model, asr_model)
+                keeper.stop()
+                if keeper.lost:
+                    print(f"  Lease {job['name']} hilang — hasil dibuang, job diambil worker lain.")
+                    continue
+                audio_seconds = max((seg['end'] for seg in segments), default=0.0)
+                if finish_job(conn, job, worker_id, args.spool, args.done, create_srt(segments), audio_seconds):
+                    if segments:
+                        print(f"✓ {job['name']} selesai ({len(segments)} segmen)")
+                    else:
+                        print(f"✓ {job['name']} selesai (tidak ada ucapan, SRT kosong)")
+                else:
+                    print(f"  Lease {job['name']} hilang — hasil dibuang, job diambil worker lain.")
+            except KeyboardInterrupt:
+                keeper.stop()
+                # Kembalikan job ke antrian agar bisa langsung diambil worker lain
+                conn.execute(
+                    "UPDATE jobs SET status = 'pending', lease_expires = NULL, attempts = attempts - 1 "
+                    "WHERE name = ? AND worker = ? AND status = 'running'",
+                    (job['name'], worker_id),
+                )
+                print("\nWorker dihentikan.")
+                return 130
+            except Exception as e:
+                keeper.stop()
+                traceback.print_exc()
+                try:
+                    status = fail_job(conn, job, worker_id, str(e), args.max_retries)
+                except sqlite3.OperationalError as db_error:
+                    # Status tidak tercatat; lease akan kedaluwarsa dan job diambil ulang
+                    print(f"  Warning: gagal mencatat error {job['name']}: {db_error}")
+                    continue
+                print(f"  Error memproses {job['name']}: {e} -> status {status}")
+    finally:
+        if client is not None:
+            client.print_stats()
+        if isinstance(client, ChatRequester):
+            client.close()
+
+
+def queue_stats(conn, now=None):
+    """Collect queue depth, per-worker throughput and retry counts."""
+    now = time.time() if now is None else now
+    depth = {'pending': 0, 'running': 0, 'expired': 0, 'done': 0, 'failed': 0}
+    for row in conn.execute(
+        "SELECT status, (status = 'running' AND lease_expires < ?) AS expired, COUNT(*) AS n "
+        "FROM jobs GROUP BY status, expired",
+        (now,),
+    ):
+        depth['expired' if row['expired'] else row['status']] += row['n']
+
+    workers = []
+    for row in conn.execute(
+        "SELECT worker, COUNT(*) AS jobs, SUM(finished_at - started_at) AS busy, "
+        "SUM(audio_seconds) AS audio, MIN(started_at) AS first, MAX(finished_at) AS last "
+        "FROM jobs WHERE status = 'done' GROUP BY worker ORDER BY worker"
+    ):
+        busy = row['busy'] or 0.0
+        audio = row['audio'] or 0.0
+        span = (row['last'] - row['first']) if row['last'] and row['first'] else 0.0
+        workers.append({
+            'worker': row['worker'],
+            'jobs_done': row['jobs'],
+            'busy_seconds': busy,
+            'audio_seconds': audio,
+            'avg_seconds_per_job': busy / row['jobs'] if row['jobs'] else 0.0,
+            'realtime_factor': audio / busy if busy else 0.0,
+            'jobs_per_hour': row['jobs'] * 3600 / span if span else 0.0,
+        })
+
+    retries = conn.execute(
+        "SELECT COALESCE(SUM(MAX(attempts - 1, 0)), 0) AS retries, "
+        "COALESCE(SUM(attempts > 1), 0) AS retried_jobs FROM jobs"
+    ).fetchone()
+    failed = [dict(row) for row in conn.execute(
+        "SELECT name, attempts, worker, error FROM jobs WHERE status = 'failed' ORDER BY name"
+    )]
+
+    return {
+        'depth': depth,
+        'workers': workers,
+        'retries': retries['retries'],
+        'retried_jobs': retries['retried_jobs'],
+        'failed': failed,
+    }
+
+
+def print_status(args):
+    db_path = args.queue_db or os.path.join(args.spool, ".queue.sqlite")
+    if not os.path.exists(db_path):
+        print(f"Error: database antrian {db_path} tidak ditemukan!")
+        return 1
+    stats = queue_stats(connect_queue(db_path))
+
+    if args.json:
+        print(json.dumps(stats, indent=2))
+        return 0
+
+    depth = stats['depth']
+    print(f"Antrian: {db_path}")
+    print(f"  Pending          : {depth['pending']}")
+    print(f"  Running          : {depth['running']}")
+    print(f"  Lease kedaluwarsa: {depth['expired']}")
+    print(f"  Done             : {depth['done']}")
+    print(f"  Failed           : {depth['failed']}")
+    print(f"  Retry            : {stats['retries']} ({stats['retried_jobs']} job)")
+
+    if stats['workers']:
+        print("\nThroughput per worker:")
+        for w in stats['workers']:
+            print(f"  {w['worker']}: {w['jobs_done']} job, rata-rata {w['avg_seconds_per_job']:.0f}s/job, "
+                  f"{w['realtime_factor']:.1f}x realtime, {w['jobs_per_hour']:.1f} job/jam")
+
+    if stats['failed']:
+        print("\nJob gagal:")
+        for job in stats['failed']:
+            print(f"  {job['name']} ({job['attempts']}x, {job['worker']}): {job['error']}")
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Worker antrian spool untuk whisper.py (multi-worker, multi-node)")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    run = sub.add_parser("run", help="Jalankan worker yang memproses file dari spool")
+    run.add_argument("--spool", required=True, help="Direktori spool (shared/NFS) berisi file audio")
+    run.add_argument("--done", required=True, help="Direktori tujuan untuk audio + SRT yang selesai")
+    run.add_argument("--queue-db", help="File SQLite lease table (default: <spool>/.queue.sqlite)")
+    run.add_argument("--worker-id", help="Nama worker (default: <hostname>-<pid>)")
+    run.add_argument("--lease", type=float, default=300,
+                     help="Durasi lease dalam detik; diperpanjang otomatis selama job berjalan (default: 300)")
+    run.add_argument("--max-retries", type=int, default=3,
+                     help="Jumlah percobaan maksimal per file sebelum ditandai failed (default: 3)")
+    run.add_argument("--poll", type=float, default=10,
+                     help="Jeda scan spool saat antrian kosong, dalam detik (default: 10)")
+    run.add_argument("--settle", type=float, default=10,
+                     help="File harus tidak berubah selama N detik sebelum diambil (default: 10)")
+    run.add_argument("--once", action="store_true", help="Berhenti saat antrian kosong")
+    run.add_argument("--method", default="transcribe", choices=["transcribe", "transcribe-only"],
+                     help="Metode processing (default: transcribe)")
+    run.add_argument("--api_key", required=False, help="API key OpenAI (opsional jika menggunakan config.ini)")
+    run.add_argument("--config", default="config.ini", help="File konfigurasi (default: config.ini)")
+    run.add_argument("--model", default="gpt-3.5-turbo", help="Model OpenAI untuk translasi (default: gpt-3.5-turbo)")
+    run.add_argument("--request-timeout", type=float, default=REQUEST_TIMEOUT,
+                     help=f"Deadline per request translasi dalam detik (default: {REQUEST_TIMEOUT})")
+    run.add_argument("--max-retries-request", dest="max_retries_request", type=int, default=REQUEST_RETRIES,
+                     help=f"Jumlah retry per request translasi (default: {REQUEST_RETRIES})")
+    run.add_argument("--hedge", action="store_true",
+                     help="Kirim request duplikat jika batch belum kembali setelah p95 latency")
+    run.add_argument("--hedge-budget", type=float, default=HEDGE_BUDGET,
+                     help=f"Maksimal request hedge sebagai fraksi dari jumlah request (default: {HEDGE_BUDGET})")
+    run.add_argument("--translator", default="openai", choices=["openai", "local"],
+                     help="Backend translasi: 'openai' (GPT, default) atau 'local' (model CTranslate2 offline)")
+    run.add_argument("--mt-model", default=None, help="Path model CTranslate2 + tokenizer untuk --translator local")
+    run.add_argument("--mt-device", default="cpu", choices=["cpu", "cuda"],
+                     help="Device untuk model translasi lokal (default: cpu)")
+    run.add_argument("--mt-compute-type", default="int8", choices=["int8", "float16", "float32"],
+                     help="Compute type model translasi lokal (default: int8)")
+    run.add_argument("--mt-target-lang", default=None,
+                     help="Bahasa target tetap model Marian (default: dibaca dari tokenizer_config.json)")
+    run.add_argument("--whisper-model", default="jctv-tech/kotoba-whisper-v21-ct2",
+                     help="Model Whisper lokal (default: jctv-tech/kotoba-whisper-v21-ct2)")
+    run.add_argument("--batch-size", type=int, default=5,
+                     help="Jumlah dialog per batch untuk translasi (default: 5)")
+    run.add_argument("--device", default="cuda", choices=["cuda", "cpu"],
+                     help="Device untuk model Whisper (default: cuda)")
+    run.add_argument("--compute-type", default="int8", choices=["float16", "int8", "float32"],
+                     help="Compute type untuk model Whisper (default: int8)")
+    run.add_argument("--loop-guard", action="store_true",
+                     help="Deteksi loop repetisi saat decode; hanya window yang loop di-decode ulang")
+    run.add_argument("--adaptive", action="store_true",
+                     help="Decode greedy, hanya segmen dengan confidence rendah di-decode ulang dengan beam search")
+    run.add_argument("--fingerprint-db", default=None,
+                     help="Indeks fingerprint (fingerprint.py) untuk melewati opening/ending/jingle yang dikenali")
+
+    status = sub.add_parser("status", help="Tampilkan kedalaman antrian, throughput dan retry")
+    status.add_argument("--spool", required=True, help="Direktori spool")
+    status.add_argument("--queue-db", help="File SQLite lease table (default: <spool>/.queue.sqlite)")
+    status.add_argument("--json", action="store_true", help="Output dalam format JSON")
+
+    args = parser.parse_args()
+
+    if not os.path.isdir(args.spool):
+        print(f"Error: Direktori spool {args.spool} tidak ditemukan!")
+        return 1
+
+    if args.command == "status":
+        return print_status(args)
+    return run_worker(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())